@@ -1,16 +1,76 @@
-import httpx
+import json
 from fastapi import UploadFile
+from app.clients.http import model_api
+from app.clients.resilience import CircuitBreaker, Resilience, RetryBudget
 from app.config import settings
 
+model_resilience = Resilience(
+    model_api.name,
+    CircuitBreaker(model_api.name, settings.MODEL_API_BREAKER_FAILURE_THRESHOLD, settings.MODEL_API_BREAKER_RESET_SECONDS,
+                   settings.MODEL_API_BREAKER_HALF_OPEN_CALLS),
+    RetryBudget(settings.MODEL_API_RETRY_BUDGET_RATIO, settings.MODEL_API_RETRY_BUDGET_MIN_PER_SECOND),
+    max_retries=settings.MODEL_API_MAX_RETRIES,
+    backoff=settings.MODEL_API_RETRY_BACKOFF_SECONDS,
+)
+
+def check_available():
+    """Fail fast with CircuitOpenError while the model API's breaker is open"""
+    model_resilience.breaker.check()
+
 async def parse_cv(cv: UploadFile):
-    async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-        files = {'file': (cv.filename, await cv.read(), cv.content_type)}
-        response = await client.post(f"{settings.MODEL_API_URL}/parse", files=files)
-        response.raise_for_status()
-        return response.json()
+    # Parsing is idempotent: safe to retry and, when enabled, to hedge.
+    # Hedged attempts run concurrently and cannot share one file handle, so
+    # only small uploads are read into memory; larger ones keep streaming
+    # the spooled file (re-seeked on every retry).
+    await cv.seek(0)
+    content = None
+    hedge = settings.MODEL_API_HEDGE_ENABLED and (cv.size or 0) <= settings.MODEL_API_HEDGE_MAX_BYTES
+    if hedge:
+        content = await cv.read()
+
+    async def attempt():
+        if content is None:
+            await cv.seek(0)
+        files = {'file': (cv.filename, cv.file if content is None else content, cv.content_type)}
+        return await model_api.request("POST", "/parse", operation="parse_cv", files=files, timeout=settings.MODEL_API_PARSE_TIMEOUT)
+
+    response = await model_resilience.call("parse_cv", attempt, idempotent=True, hedge=hedge)
+    return response.json()
+
+async def parse_cv_text(text: str, filename: str | None = None):
+    # Locally extracted text: a few KB of JSON instead of the whole file
+    async def attempt():
+        return await model_api.request("POST", "/parse/text", operation="parse_cv_text", json={"text": text, "filename": filename},
+                                       timeout=settings.MODEL_API_PARSE_TIMEOUT)
+
+    response = await model_resilience.call("parse_cv_text", attempt, idempotent=True, hedge=settings.MODEL_API_HEDGE_ENABLED)
+    return response.json()
 
 async def simulate_interview(prompt: str):
-    async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-        response = await client.post(f"{settings.MODEL_API_URL}/simulate", json={"prompt": prompt})
-        response.raise_for_status()
-        return response.json()
+    async def attempt():
+        return await model_api.request("POST", "/simulate", operation="simulate_interview", json={"prompt": prompt}, timeout=settings.MODEL_API_SIMULATE_TIMEOUT)
+
+    # Each call generates a new answer: only retried when the request never reached the model
+    response = await model_resilience.call("simulate_interview", attempt)
+    return response.json()
+
+async def stream_interview(prompt: str):
+    """Yield answer chunks from the model's SSE endpoint.
+
+    Each `data:` line carries either a JSON object with a `token` field or raw
+    text; `[DONE]` ends the stream.
+    """
+    async with model_resilience.guard(), \
+            model_api.stream("POST", "/simulate/stream", operation="stream_interview", json={"prompt": prompt}, timeout=settings.MODEL_API_SIMULATE_TIMEOUT) as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].removeprefix(" ")
+            if data == "[DONE]":
+                break
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                yield data
+                continue
+            yield payload.get("token", "") if isinstance(payload, dict) else str(payload)
@@ -0,0 +1,133 @@
+import time
+from contextlib import asynccontextmanager
+import httpx
+from app.config import settings
+from app.core.metrics import Gauge, Histogram
+
+upstream_request_duration = Histogram("upstream_request_duration_seconds", "Upstream API call latency", ("upstream", "operation", "outcome"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class UpstreamClient:
+    """Shared httpx client (keep-alive pool) for one upstream API"""
+
+    def __init__(self, name: str, base_url: str, timeout: float):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on demand when called outside the lifespan (scripts, shell)
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+            )
+        return self._client
+
+    def url(self, path: str = "") -> str:
+        return f"{self.base_url}{path}"
+
+    async def start(self):
+        self.client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, path: str = "", *, operation: str | None = None, timeout: float | None = None, **kwargs) -> httpx.Response:
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT)
+        self.requests += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.client.request(method, self.url(path), **kwargs)
+            response.raise_for_status()
+            outcome = "ok"
+            return response
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            upstream_request_duration.observe(time.perf_counter() - start, upstream=self.name,
+                                              operation=operation or path or "/", outcome=outcome)
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str = "", *, operation: str | None = None, timeout: float | None = None, **kwargs):
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT)
+        self.requests += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self.client.stream(method, self.url(path), **kwargs) as response:
+                response.raise_for_status()
+                yield response
+            outcome = "ok"
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            # Covers the whole stream, not just the time to the first byte
+            upstream_request_duration.observe(time.perf_counter() - start, upstream=self.name,
+                                              operation=operation or path or "/", outcome=outcome)
+
+    def stats(self) -> dict:
+        connections = []
+        if self._client is not None:
+            pool = getattr(self._client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+        return {
+            "name": self.name,
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+        }
+
+model_api = UpstreamClient("model_api", settings.MODEL_API_URL, settings.API_TIMEOUT)
+job_api = UpstreamClient("job_api", settings.JOB_API_URL, settings.API_TIMEOUT)
+# Token exchange and userinfo are on different Google hosts: callers pass absolute URLs
+google_api = UpstreamClient("google_oauth", "", settings.GOOGLE_API_TIMEOUT)
+
+upstream_clients = [model_api, job_api, google_api]
+
+def _pool_stat(field: str):
+    return lambda: {(upstream.name,): upstream.stats()[field] for upstream in upstream_clients}
+
+Gauge("upstream_pool_connections", "Open connections per upstream pool", ("upstream",), function=_pool_stat("connections"))
+Gauge("upstream_pool_idle_connections", "Idle keep-alive connections per upstream pool", ("upstream",), function=_pool_stat("idle_connections"))
+Gauge("upstream_in_flight_requests", "Requests currently awaiting an upstream", ("upstream",), function=_pool_stat("in_flight"))
+
+async def start_clients():
+    for upstream in upstream_clients:
+        await upstream.start()
+
+async def close_clients():
+    for upstream in upstream_clients:
+        await upstream.close()
@@ -1,8 +1,6 @@
-import httpx
+from app.clients.http import job_api
 from app.config import settings
 
 async def get_job_offers():
-    async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-        response = await client.get(settings.JOB_API_URL)
-        response.raise_for_status()
-        return response.json()
+    response = await job_api.request("GET", operation="get_job_offers", timeout=settings.JOB_API_TIMEOUT)
+    return response.json()
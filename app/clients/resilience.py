@@ -0,0 +1,239 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, TypeVar
+import httpx
+from app.core.metrics import Counter, Gauge
+
+T = TypeVar("T")
+
+circuit_rejections = Counter("upstream_circuit_rejections_total", "Calls rejected by an open circuit breaker", ("upstream",))
+upstream_retries = Counter("upstream_retries_total", "Upstream retries by outcome of the budget check", ("upstream", "outcome"))
+upstream_hedges = Counter("upstream_hedged_requests_total", "Hedged requests sent after the p95 delay", ("upstream", "winner"))
+
+class CircuitOpenError(Exception):
+    """The upstream is failing and calls are short-circuited"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+def is_failure(error: BaseException) -> bool:
+    """Errors that say something about the upstream's health (not 4xx)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+def is_retryable(error: BaseException, idempotent: bool) -> bool:
+    # The request never reached the upstream: always safe to send again
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    if not idempotent:
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in (502, 503, 504)
+    return isinstance(error, httpx.TransportError)
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures; after
+    `reset_timeout` a limited number of half-open probes decide whether to close again."""
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def check(self):
+        """Raise if a call would be rejected, without reserving a probe"""
+        if self.state == self.OPEN and self._retry_after() > 0:
+            raise CircuitOpenError(self.name, self._retry_after())
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            if self._retry_after() > 0:
+                circuit_rejections.inc(upstream=self.name)
+                raise CircuitOpenError(self.name, self._retry_after())
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+        if self.state == self.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                circuit_rejections.inc(upstream=self.name)
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self.half_open_calls += 1
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def release(self):
+        # Cancelled probe: give the slot back without judging the upstream
+        if self.state == self.HALF_OPEN and self.half_open_calls:
+            self.half_open_calls -= 1
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after": round(self._retry_after(), 2) if self.state == self.OPEN else 0,
+        }
+
+class RetryBudget:
+    """Token bucket capping retries to a fraction of recent traffic.
+
+    Every request deposits `ratio` tokens, the bucket also refills at
+    `min_per_second` so low traffic can still retry, and each retry costs one token.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, window: float = 10):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max(1.0, min_per_second * window)
+        self.balance = self.max_balance
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.max_balance, self.balance + (now - self.updated_at) * self.min_per_second)
+        self.updated_at = now
+
+    def record_request(self):
+        self._refill()
+        self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        self._refill()
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        return False
+
+class LatencyTracker:
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def p95(self) -> float | None:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+class Resilience:
+    """Circuit breaker, budgeted retries with jittered backoff and optional hedging for one upstream"""
+
+    def __init__(self, name: str, breaker: CircuitBreaker, budget: RetryBudget, max_retries: int, backoff: float):
+        self.name = name
+        self.breaker = breaker
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.latency: dict[str, LatencyTracker] = {}
+        upstream_resilience.append(self)
+
+    def _tracker(self, operation: str) -> LatencyTracker:
+        return self.latency.setdefault(operation, LatencyTracker())
+
+    async def call(self, operation: str, func: Callable[[], Awaitable[T]], idempotent: bool = False, hedge: bool = False) -> T:
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            start = time.monotonic()
+            try:
+                delay = self._tracker(operation).p95() if hedge else None
+                result = await (self._hedged(func, delay) if delay is not None else func())
+            except Exception as e:
+                # A 4xx still proves the upstream is answering
+                if is_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if attempt >= self.max_retries or not is_retryable(e, idempotent):
+                    raise
+                if not self.budget.try_withdraw():
+                    upstream_retries.inc(upstream=self.name, outcome="budget_exhausted")
+                    raise
+                upstream_retries.inc(upstream=self.name, outcome="retried")
+                attempt += 1
+                # Full jitter: spreads retries of concurrent callers apart
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self._tracker(operation).observe(time.monotonic() - start)
+            return result
+
+    async def _hedged(self, func: Callable[[], Awaitable[T]], delay: float) -> T:
+        primary = asyncio.ensure_future(func())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge = asyncio.ensure_future(func())
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        upstream_hedges.inc(upstream=self.name, winner="hedge" if task is hedge else "primary")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @asynccontextmanager
+    async def guard(self):
+        """Breaker accounting for calls that cannot be retried, such as streams"""
+        self.breaker.before_call()
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+
+    def snapshot(self) -> dict:
+        return {"name": self.name, "circuit": self.breaker.snapshot(), "retry_budget": round(self.budget.balance, 2),
+                "p95_seconds": {operation: tracker.p95() for operation, tracker in self.latency.items()}}
+
+_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+upstream_resilience: list[Resilience] = []
+
+Gauge("upstream_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("upstream",),
+      function=lambda: {(resilience.name,): _STATE_VALUES[resilience.breaker.state] for resilience in upstream_resilience})
+Gauge("upstream_retry_budget_tokens", "Retries currently allowed by the retry budget", ("upstream",),
+      function=lambda: {(resilience.name,): resilience.budget.balance for resilience in upstream_resilience})
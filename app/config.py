@@ -10,10 +10,26 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    AUTH_HASH_WORKERS: int = 2
+    AUTH_HASH_MAX_PENDING: int = 16
+    ACTIVITY_FLUSH_INTERVAL: float = 30
+    ACTIVITY_BUFFER_MAX_USERS: int = 5000
 
     # Email 
     GMAIL_USER: str
     GMAIL_PASSWORD: str
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 465
+    SMTP_USE_SSL: bool = True
+    SMTP_TIMEOUT: float = 30
+    SMTP_IDLE_TIMEOUT: float = 60
+    CONTACT_BATCH_SIZE: int = 20
+    CONTACT_MAX_ATTEMPTS: int = 5
+    CONTACT_RETRY_BASE_SECONDS: float = 10
+    CONTACT_POLL_INTERVAL: float = 30
+    CONTACT_LEASE_SECONDS: float = 120
 
     # MongoDB 
     MONGO_URI: str
@@ -21,6 +37,10 @@ class Settings(BaseSettings):
     MONGO_CV_COLLECTION: str
     MONGO_INTERVIEW_COLLECTION: str
     MONGO_FEEDBACK_COLLECTION: str
+    MONGO_CONTACT_OUTBOX_COLLECTION: str = "contact_outbox"
+    MONGO_CV_JOB_COLLECTION: str = "cv_jobs"
+    MONGO_INTERVIEW_ARCHIVE_COLLECTION: str = "interview_archives"
+    MONGO_RATE_LIMIT_COLLECTION: str = "rate_limits"
 
     # PostgreSQL 
     DATABASE_URL: str
@@ -30,11 +50,84 @@ class Settings(BaseSettings):
     API_TIMEOUT: int = 10
     JOB_API_URL: str
     MODEL_API_URL: str
+    MODEL_API_PARSE_TIMEOUT: float = 60
+    MODEL_API_SIMULATE_TIMEOUT: float = 30
+    JOB_API_TIMEOUT: float = 10
+    JOB_OFFERS_TTL_SECONDS: float = 300
+
+    # Shared HTTP clients
+    HTTP_CONNECT_TIMEOUT: float = 5
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30
+    HTTP2_ENABLED: bool = False
+
+    # Model API resilience
+    MODEL_API_BREAKER_FAILURE_THRESHOLD: int = 5
+    MODEL_API_BREAKER_RESET_SECONDS: float = 30
+    MODEL_API_BREAKER_HALF_OPEN_CALLS: int = 1
+    MODEL_API_MAX_RETRIES: int = 2
+    MODEL_API_RETRY_BACKOFF_SECONDS: float = 0.2
+    MODEL_API_RETRY_BUDGET_RATIO: float = 0.2
+    MODEL_API_RETRY_BUDGET_MIN_PER_SECOND: float = 1
+    MODEL_API_HEDGE_ENABLED: bool = False
+    MODEL_API_HEDGE_MAX_BYTES: int = 1024 * 1024
+
+    # Admission control of model-backed endpoints, per authenticated user
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory" # memory | mongo (buckets shared between API workers)
+    RATE_LIMIT_MAX_USERS: int = 10000 # Buckets kept by the memory backend
+    RATE_LIMIT_BUCKET_TTL_SECONDS: int = 3600 # Idle buckets are dropped (long after they are full again)
+    RATE_LIMIT_CV_PER_MINUTE: float = 6
+    RATE_LIMIT_CV_BURST: int = 3
+    RATE_LIMIT_INTERVIEW_PER_MINUTE: float = 30
+    RATE_LIMIT_INTERVIEW_BURST: int = 10
+    MODEL_MAX_CONCURRENT_CALLS: int = 32 # Model calls in flight per process, interview turns and CV jobs
+    MODEL_QUEUE_MAX_PER_USER: int = 2
+    MODEL_QUEUE_TIMEOUT_SECONDS: float = 15
+    IDEMPOTENCY_TTL_SECONDS: float = 900 # Responses replayed for a retried Idempotency-Key
+    IDEMPOTENCY_MAX_KEYS: int = 5000
+
+    # CV parsing
+    CV_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    CV_UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    CV_PARSE_CACHE_SIZE: int = 1024
+    CV_PARSE_CACHE_TTL_SECONDS: float = 3600
+    CV_JOB_STORAGE_DIR: str = "/tmp/ai_interview_cv_jobs" # Must be shared between API workers
+    CV_JOB_WORKERS: int = 4 # Concurrent parses sent to the model API per process
+    CV_JOB_MAX_PENDING: int = 200
+    CV_JOB_MAX_ATTEMPTS: int = 3
+    CV_JOB_RETRY_BASE_SECONDS: float = 5
+    CV_JOB_POLL_INTERVAL: float = 5
+    CV_JOB_LEASE_SECONDS: float = 300
+    CV_SEND_TEXT_TO_MODEL: bool = False # Send the locally extracted text to /parse/text instead of the file
+
+    # Local PDF text extraction
+    PDF_EXTRACT_ENABLED: bool = True
+    PDF_EXTRACT_WORKERS: int = 2
+    PDF_EXTRACT_MAX_PENDING: int = 8
+    PDF_EXTRACT_MAX_PAGES: int = 20
+    PDF_EXTRACT_MAX_CHARS: int = 100_000
+    PDF_EXTRACT_TIMEOUT_SECONDS: float = 10
+
+    # Feedback batches
+    FEEDBACK_BATCH_MAX_ITEMS: int = 1000
+    FEEDBACK_BATCH_MAX_BYTES: int = 5 * 1024 * 1024
+    FEEDBACK_BATCH_WRITE_SIZE: int = 500
+
+    # Interview prompt context window (1 token is roughly 4 characters)
+    INTERVIEW_CONTEXT_MAX_TURNS: int = 6
+    INTERVIEW_CONTEXT_MAX_CHARS: int = 8000
+    INTERVIEW_SUMMARY_MAX_CHARS: int = 2000
+    INTERVIEW_SUMMARY_LINE_CHARS: int = 200
+    INTERVIEW_ARCHIVE_COMPRESSION_LEVEL: int = 6
+    INTERVIEW_ABANDONED_AFTER_HOURS: float = 24
 
     # Google OAuth 
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/v1/auth/oauth/google/callback"
+    GOOGLE_API_TIMEOUT: float = 10
 
     # Frontend URLs 
     FRONTEND_URL: str = "http://localhost:5173"
@@ -0,0 +1,186 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import Counter, Gauge
+from app.models.mongo.rate_limit_bucket_model import RateLimitBucketModel
+
+admission_decisions = Counter("admission_decisions_total", "Admission control decisions", ("endpoint_class", "result"))
+
+class AdmissionRejectedError(Exception):
+    """The request is over its user's rate limit or cannot get a model call slot in time"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+def _take(tokens: float, elapsed: float, rate: float, burst: int) -> tuple[float, float]:
+    """Refill for `elapsed` seconds then take one token: returns (tokens left, seconds to wait, 0 if admitted)"""
+    tokens = min(burst, tokens + max(0.0, elapsed) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+class MemoryBucketStore:
+    """Token buckets of this process only"""
+
+    def __init__(self, maxsize: int):
+        # An evicted bucket comes back full, as it would after a long idle
+        self._buckets = TTLCache(maxsize=maxsize, ttl=settings.RATE_LIMIT_BUCKET_TTL_SECONDS)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (burst, now))
+        tokens, wait = _take(tokens, now - updated_at, rate, burst)
+        self._buckets.set(key, (tokens, now))
+        return wait
+
+class MongoBucketStore:
+    """Token buckets shared by every API process through a Mongo collection.
+
+    Read-modify-write under a version guard: a concurrent update makes the
+    loser read the bucket again. Idle buckets expire through the TTL index
+    of RateLimitBucketModel.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, max_attempts: int = 5):
+        self.collection = collection
+        self.max_attempts = max_attempts
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        for _ in range(self.max_attempts):
+            now = datetime.utcnow()
+            bucket = await self.collection.find_one({"_id": key})
+            if bucket is None:
+                tokens, wait = _take(burst, 0.0, rate, burst)
+                try:
+                    await self.collection.insert_one({"_id": key, "tokens": tokens, "updated_at": now, "version": 1})
+                except DuplicateKeyError:
+                    continue
+                return wait
+            tokens, wait = _take(bucket["tokens"], (now - bucket["updated_at"]).total_seconds(), rate, burst)
+            result = await self.collection.update_one(
+                {"_id": key, "version": bucket["version"]},
+                {"$set": {"tokens": tokens, "updated_at": now}, "$inc": {"version": 1}})
+            if result.matched_count:
+                return wait
+        # Heavy contention on a single user's bucket: that user is over the limit anyway
+        return 1 / rate
+
+class FairLimiter:
+    """Caps concurrent model calls; waiters are served round-robin across users.
+
+    Each user has its own FIFO of waiters and a freed slot goes to the next
+    user in turn, so one user queueing many requests delays only themselves.
+    """
+
+    def __init__(self, limit: int, max_waiting_per_user: int):
+        self.limit = limit
+        self.max_waiting_per_user = max_waiting_per_user
+        self.active = 0
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiters.values())
+
+    async def acquire(self, user: str, timeout: float | None):
+        """timeout=None waits as long as needed, without the per-user queue cap"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        queue = self._waiters.get(user) or deque()
+        if timeout is not None and len(queue) >= self.max_waiting_per_user:
+            raise AdmissionRejectedError("Too many of your requests are already waiting for the model", timeout)
+        self._waiters[user] = queue
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._discard(user, waiter)
+            raise AdmissionRejectedError("The model service is busy, please retry", timeout) from None
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller went away
+                self.release()
+            else:
+                self._discard(user, waiter)
+            raise
+
+    def release(self):
+        # Slot handed to the oldest waiter of the next user in turn
+        while self._waiters:
+            user, queue = next(iter(self._waiters.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(user)
+            else:
+                del self._waiters[user]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, user: str, waiter: asyncio.Future):
+        queue = self._waiters.get(user)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._waiters[user]
+
+class AdmissionControl:
+    """Per-user token buckets by endpoint class, then a fair slot for the model call.
+
+    The buckets live in a pluggable store (this process by default, Mongo to
+    share them between workers); the concurrency cap is per process.
+    """
+
+    def __init__(self):
+        self.limits = {
+            "cv": (settings.RATE_LIMIT_CV_PER_MINUTE / 60, settings.RATE_LIMIT_CV_BURST),
+            "interview": (settings.RATE_LIMIT_INTERVIEW_PER_MINUTE / 60, settings.RATE_LIMIT_INTERVIEW_BURST),
+        }
+        self.store: MemoryBucketStore | MongoBucketStore = MemoryBucketStore(settings.RATE_LIMIT_MAX_USERS)
+        self.limiter = FairLimiter(settings.MODEL_MAX_CONCURRENT_CALLS, settings.MODEL_QUEUE_MAX_PER_USER)
+
+    def start(self, db):
+        if settings.RATE_LIMIT_BACKEND == "mongo":
+            self.store = MongoBucketStore(db[RateLimitBucketModel.collection_name])
+
+    async def check(self, endpoint_class: str, user: str):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        rate, burst = self.limits[endpoint_class]
+        wait = await self.store.take(f"{endpoint_class}:{user}", rate, burst)
+        if wait > 0:
+            admission_decisions.inc(endpoint_class=endpoint_class, result="rate_limited")
+            raise AdmissionRejectedError(f"Too many {endpoint_class} requests, please slow down", wait)
+        admission_decisions.inc(endpoint_class=endpoint_class, result="admitted")
+
+    @asynccontextmanager
+    async def model_slot(self, user: str, wait: bool = False):
+        """Hold one of MODEL_MAX_CONCURRENT_CALLS slots; background work passes wait=True to queue without limit"""
+        try:
+            await self.limiter.acquire(user, None if wait else settings.MODEL_QUEUE_TIMEOUT_SECONDS)
+        except AdmissionRejectedError:
+            admission_decisions.inc(endpoint_class="model_call", result="queue_rejected")
+            raise
+        try:
+            yield
+        finally:
+            self.limiter.release()
+
+def retry_after_header(error: AdmissionRejectedError) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+
+model_admission = AdmissionControl()
+
+Gauge("model_calls_in_flight", "Model calls holding an admission slot", function=lambda: model_admission.limiter.active)
+Gauge("model_calls_waiting", "Requests queued for a model call slot", function=lambda: model_admission.limiter.waiting)
@@ -1,12 +1,37 @@
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from sqlalchemy import Table, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.core.instrumentation import InstrumentedQueuePool, MongoCommandMetrics, instrument_engine
+
+logger = logging.getLogger(__name__)
 
 # MongoDB
-mongo_client = AsyncIOMotorClient(settings.MONGO_URI)
+mongo_client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[MongoCommandMetrics()])
 mongo_db = mongo_client[settings.MONGO_DB_NAME]
 
 # PostgreSQL
-engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True, poolclass=InstrumentedQueuePool)
+instrument_engine(engine)
 AsyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+async def add_missing_columns(table: Table):
+    """ALTER TABLE ... ADD COLUMN for nullable columns of `table` that an existing database lacks"""
+    def missing_columns(conn):
+        inspector = inspect(conn)
+        if not inspector.has_table(table.name):
+            return []
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        return [column for column in table.columns if column.name not in existing]
+
+    async with engine.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        for column in await conn.run_sync(missing_columns):
+            if not column.nullable:
+                raise RuntimeError(f"Column {table.name}.{column.name} is missing and cannot be added automatically")
+            ddl = (f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} "
+                   f"{column.type.compile(dialect=conn.dialect)}")
+            logger.warning("Adding missing column: %s", ddl)
+            await conn.execute(text(ddl))
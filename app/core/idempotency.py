@@ -0,0 +1,63 @@
+import hashlib
+from typing import Any, Awaitable, Callable
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
+from app.core.singleflight import SingleFlight
+
+idempotent_requests = Counter("idempotent_requests_total", "Requests carrying an Idempotency-Key", ("result",))
+
+class IdempotencyKeyReusedError(Exception):
+    """The Idempotency-Key was already used for a different request"""
+
+def fingerprint(*parts: str) -> str:
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+class IdempotencyStore:
+    """Responses of completed requests by (scope, Idempotency-Key), for a TTL.
+
+    A replay returns the stored response without running the request again;
+    a duplicate arriving while the original is still running waits for it
+    (single-flight) and gets the same response, or a conflict if its body
+    differs. Failures are not stored, so the client can retry them.
+    Entries are per process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Fingerprint of the request behind each in-flight call
+        self._fingerprints = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight = SingleFlight()
+
+    async def run(self, scope: str, key: str, request_fingerprint: str, func: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Returns (response, replayed); only the caller that ran `func` gets replayed=False"""
+        stored = self._responses.get((scope, key))
+        if stored is not None:
+            if stored[0] != request_fingerprint:
+                idempotent_requests.inc(result="conflict")
+                raise IdempotencyKeyReusedError("Idempotency-Key already used for a different request")
+            idempotent_requests.inc(result="replayed")
+            return stored[1], True
+
+        flight_key = f"{scope}:{key}"
+        if self._in_flight.in_flight("idempotency", flight_key):
+            # A failed call may already have dropped its fingerprint: the duplicate gets the same failure
+            running = self._fingerprints.get(flight_key)
+            if running is not None and running != request_fingerprint:
+                idempotent_requests.inc(result="conflict")
+                raise IdempotencyKeyReusedError("Idempotency-Key already used for a different request")
+            idempotent_requests.inc(result="joined")
+            replayed = True
+        else:
+            self._fingerprints.set(flight_key, request_fingerprint)
+            replayed = False
+
+        async def first():
+            try:
+                response = await func()
+                self._responses.set((scope, key), (request_fingerprint, response))
+                idempotent_requests.inc(result="executed")
+                return response
+            finally:
+                self._fingerprints.pop(flight_key)
+
+        return await self._in_flight.do("idempotency", flight_key, first), replayed
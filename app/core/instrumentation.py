@@ -0,0 +1,103 @@
+import re
+import time
+from pymongo import monitoring
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.metrics import Counter, Gauge, Histogram
+
+http_request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+http_responses = Counter("http_responses_total", "HTTP responses by route and status", ("method", "route", "status"))
+mongo_command_duration = Histogram("mongo_command_duration_seconds", "MongoDB command latency", ("command", "outcome"))
+db_query_duration = Histogram("db_query_duration_seconds", "PostgreSQL statement latency", ("operation", "outcome"))
+db_pool_checkout_wait = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled PostgreSQL connection",
+                                  buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0))
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = _route_template(scope)
+            http_request_duration.observe(time.perf_counter() - start, method=scope["method"], route=route)
+            http_responses.inc(method=scope["method"], route=route, status=status)
+
+_PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+def _route_template(scope) -> str:
+    # Label by path template so path parameters do not explode cardinality.
+    # Depending on the FastAPI version the matched route holds either the full
+    # template or the one relative to its router: rebuild the router prefix
+    # from the request path in the latter case.
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path_params = scope.get("path_params", {})
+    rendered = _PATH_PARAM.sub(lambda match: str(path_params.get(match.group(1), match.group(0))), template)
+    path = scope["path"]
+    if rendered and path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + template
+    return template
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
+
+def _operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        db_query_duration.observe(time.perf_counter() - start, operation=_operation(statement), outcome="ok")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            db_query_duration.observe(time.perf_counter() - starts.pop(), operation=_operation(context.statement or ""), outcome="error")
+
+    pool = engine.pool
+    Gauge("db_pool_checked_out", "PostgreSQL connections currently in use", function=lambda: pool.checkedout())
+    Gauge("db_pool_size", "PostgreSQL connections held by the pool", function=lambda: pool.checkedin() + pool.checkedout())
+    Gauge("db_pool_overflow", "PostgreSQL connections opened beyond pool_size", function=lambda: max(0, pool.overflow()))
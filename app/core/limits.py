@@ -0,0 +1,61 @@
+from starlette.responses import JSONResponse
+
+# Multipart boundaries, part headers and the other form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class _BodyTooLarge(Exception):
+    pass
+
+class BodySizeLimitMiddleware:
+    """ASGI middleware answering 413 once a request body exceeds its path's limit.
+
+    Runs before form parsing: a declared Content-Length over the limit is
+    rejected without reading the body, otherwise the body is counted as it
+    streams in and reading stops as soon as the limit is crossed.
+    """
+
+    def __init__(self, app, limits: dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def counting_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            # The app may turn the interrupted read into its own error response
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, counting_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded:
+            await self._reject(scope, receive, send, limit)
+
+    @staticmethod
+    async def _reject(scope, receive, send, limit: int):
+        response = JSONResponse({"detail": f"Request body exceeds {limit} bytes"}, status_code=413, headers={"Connection": "close"})
+        await response(scope, receive, send)
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+from app.core.metrics import Counter
+
+singleflight_calls = Counter("singleflight_calls_total", "Calls through a single-flight group", ("operation", "result"))
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into a single execution.
+
+    The first caller runs `func` in a shared task, later ones wait for the
+    same result (or the same exception). Nothing is kept once the call
+    finishes: this is not a cache.
+    """
+
+    def __init__(self):
+        self._calls: dict[tuple[str, str], _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def in_flight(self, operation: str, key: str) -> bool:
+        return (operation, key) in self._calls
+
+    async def do(self, operation: str, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        call_key = (operation, key)
+        call = self._calls.get(call_key)
+        if call is None:
+            singleflight_calls.inc(operation=operation, result="leader")
+            call = self._calls[call_key] = _Call(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda _: self._forget(call_key, call))
+        else:
+            singleflight_calls.inc(operation=operation, result="coalesced")
+
+        call.waiters += 1
+        try:
+            # shield: a caller that disconnects must not cancel the call for the others
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, call_key: tuple[str, str], call: _Call):
+        if self._calls.get(call_key) is call:
+            del self._calls[call_key]
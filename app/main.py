@@ -1,14 +1,62 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.services.auth.router import router as auth_router
 from app.services.contact.router import router as contact_router
 from app.services.interviews.router import router as interviews_router
+from app.services.jobs.router import router as jobs_router
+from app.clients.http import start_clients, close_clients, upstream_clients
+from app.clients.resilience import upstream_resilience
+from app.services.auth.activity import activity_buffer
+from app.services.auth.service import shutdown_hashing
+from app.services.contact.service import contact_mailer
+from app.services.interviews.cv_jobs import cv_job_queue
+from app.services.interviews.pdf_text import shutdown_extraction
+from app.core.admission import model_admission
+from app.core.database import add_missing_columns, mongo_db
+from app.core.instrumentation import MetricsMiddleware
+from app.core.limits import MULTIPART_OVERHEAD_BYTES, BodySizeLimitMiddleware
+from app.core.metrics import render as render_metrics
+from app.models.mongo.contact_message_model import ContactMessageModel
+from app.models.mongo.cv_job_model import CVJobModel
+from app.models.mongo.cv_model import CVModel
+from app.models.mongo.feedback_model import FeedbackModel
+from app.models.mongo.interview_history_model import InterviewHistoryModel
+from app.models.mongo.rate_limit_bucket_model import RateLimitBucketModel
+from app.models.postgres.user_model import User
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_clients()
+    # user.last_seen_at was added after the table was first created
+    try:
+        await add_missing_columns(User.__table__)
+    except Exception:
+        logger.exception("Could not check the columns of the user table")
+    for model in (CVModel, CVJobModel, InterviewHistoryModel, FeedbackModel, ContactMessageModel, RateLimitBucketModel):
+        await model.ensure_indexes(mongo_db)
+    model_admission.start(mongo_db)
+    contact_mailer.start(mongo_db)
+    cv_job_queue.start(mongo_db)
+    activity_buffer.start()
+    yield
+    await cv_job_queue.stop()
+    await contact_mailer.stop()
+    await activity_buffer.stop()
+    await close_clients()
+    shutdown_hashing()
+    shutdown_extraction()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS - Étendre les origins autorisés
@@ -28,9 +76,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Oversized CV uploads are cut off before the form is parsed and spooled
+app.add_middleware(BodySizeLimitMiddleware, limits={
+    f"{settings.API_V1_STR}/interviews/cv": settings.CV_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+})
+
+# Added last so it wraps CORS and times every request
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["Authentication"])
 app.include_router(contact_router, prefix=f"{settings.API_V1_STR}/contact", tags=["Contact"])
 app.include_router(interviews_router, prefix=f"{settings.API_V1_STR}/interviews", tags=["Interviews"])
+app.include_router(jobs_router, prefix=f"{settings.API_V1_STR}/jobs", tags=["Jobs"])
 
 @app.get("/")
 def read_root():
@@ -38,4 +95,12 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/upstreams")
+def upstreams_health():
+    return {"upstreams": [upstream.stats() for upstream in upstream_clients], "resilience": [resilience.snapshot() for resilience in upstream_resilience]}
\ No newline at end of file
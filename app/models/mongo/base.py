@@ -1,27 +1,101 @@
+from typing import ClassVar
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
 
+def object_id(value: str):
+    # Les _id générés par insert_one sont des ObjectId, l'API manipule des str
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
 class BaseMongoModel(BaseModel):
+    collection_name: ClassVar[str]
+    indexes: ClassVar[list[IndexModel]] = []
+
     id: str | None = None
 
     @classmethod
-    async def get(cls, db: AsyncIOMotorDatabase, collection: str, query: dict):
-        return await db[collection].find_one(query)
+    async def ensure_indexes(cls, db: AsyncIOMotorDatabase):
+        # create_indexes is a no-op for indexes that already exist
+        if cls.indexes:
+            await db[cls.collection_name].create_indexes(cls.indexes)
+
+    @classmethod
+    async def get(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, projection: dict | None = None):
+        return await db[collection].find_one(query, projection)
 
     @classmethod
-    async def get_all(cls, db: AsyncIOMotorDatabase, collection: str, query: dict = {}):
-        return await db[collection].find(query).to_list(1000)
+    async def get_all(cls, db: AsyncIOMotorDatabase, collection: str, query: dict = {}, projection: dict | None = None, limit: int = 1000):
+        return [doc async for doc in cls.iterate(db, collection, query, projection, limit=limit)]
+
+    @classmethod
+    async def iterate(cls, db: AsyncIOMotorDatabase, collection: str, query: dict = {}, projection: dict | None = None,
+                      batch_size: int = 100, sort: list[tuple[str, int]] | None = None, limit: int = 0):
+        """Itère sur les documents via le curseur, `batch_size` documents par aller-retour"""
+        cursor = db[collection].find(query, projection, batch_size=batch_size, limit=limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        async for doc in cursor:
+            yield doc
+
+    @classmethod
+    async def page(cls, db: AsyncIOMotorDatabase, collection: str, query: dict = {}, projection: dict | None = None,
+                   limit: int = 20, after: str | None = None) -> tuple[list[dict], str | None]:
+        """Pagination par clé sur `_id`, du plus récent au plus ancien.
+
+        `after` est le curseur renvoyé par la page précédente ; retourne les
+        documents et le curseur de la page suivante (None en fin de liste).
+        """
+        if after:
+            keyset = {"_id": {"$lt": object_id(after)}}
+            query = {"$and": [query, keyset]} if query else keyset
+        docs = [doc async for doc in cls.iterate(db, collection, query, projection, batch_size=limit + 1,
+                                                 sort=[("_id", -1)], limit=limit + 1)]
+        next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
 
     @classmethod
     async def create(cls, db: AsyncIOMotorDatabase, collection: str, data: dict):
         result = await db[collection].insert_one(data)
         return str(result.inserted_id)
 
+    @classmethod
+    async def create_many(cls, db: AsyncIOMotorDatabase, collection: str, documents: list[dict]) -> dict[int, str]:
+        """Insertion non ordonnée : un document en erreur n'empêche pas les autres.
+
+        Les `_id` sont attribués avant l'envoi ; retourne les erreurs par position
+        dans `documents`.
+        """
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+        try:
+            await db[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            return {error["index"]: error.get("errmsg", "write error") for error in e.details.get("writeErrors", [])}
+        return {}
+
     @classmethod
     async def update(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, data: dict):
         await db[collection].update_one(query, {"$set": data})
 
+    @classmethod
+    async def push(cls, db: AsyncIOMotorDatabase, collection: str, query: dict, items: dict[str, list],
+                   set_data: dict | None = None, inc: dict | None = None, projection: dict | None = None):
+        """Ajoute atomiquement des éléments à des tableaux sans réécrire le document.
+
+        Retourne le document mis à jour, ou None si `query` ne correspond plus
+        (par exemple une version déjà incrémentée par une requête concurrente).
+        """
+        update = {"$push": {field: {"$each": values} for field, values in items.items()}}
+        if set_data:
+            update["$set"] = set_data
+        if inc:
+            update["$inc"] = inc
+        return await db[collection].find_one_and_update(
+            query, update, projection=projection, return_document=ReturnDocument.AFTER
+        )
+
     @classmethod
     async def delete(cls, db: AsyncIOMotorDatabase, collection: str, query: dict):
         await db[collection].delete_one(query)
@@ -0,0 +1,20 @@
+from typing import ClassVar
+from pymongo import IndexModel
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class ContactMessageModel(BaseMongoModel):
+    collection_name: ClassVar[str] = settings.MONGO_CONTACT_OUTBOX_COLLECTION
+    indexes: ClassVar[list[IndexModel]] = [IndexModel([("status", 1), ("next_attempt_at", 1)])]
+
+    name: str
+    email: str
+    subject: str
+    message: str
+    status: str = "pending" # pending | sending | sent | failed
+    attempts: int = 0
+    next_attempt_at: str | None = None # ISO format string
+    lease_until: str | None = None # ISO format string, set while a worker holds the message
+    last_error: str | None = None
+    created_at: str | None = None # ISO format string
+    sent_at: str | None = None # ISO format string
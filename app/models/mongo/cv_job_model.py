@@ -0,0 +1,24 @@
+from typing import ClassVar
+from pymongo import IndexModel
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class CVJobModel(BaseMongoModel):
+    collection_name: ClassVar[str] = settings.MONGO_CV_JOB_COLLECTION
+    indexes: ClassVar[list[IndexModel]] = [IndexModel([("status", 1), ("next_attempt_at", 1)])]
+
+    user_id: str
+    filename: str | None = None
+    content_type: str | None = None
+    file_path: str | None = None # Upload stored on disk until the job finishes
+    size: int | None = None
+    content_hash: str
+    force_reparse: bool = False
+    status: str = "queued" # queued | processing | done | failed
+    attempts: int = 0
+    next_attempt_at: str | None = None # ISO format string
+    lease_until: str | None = None # ISO format string, set while a worker holds the job
+    cv_id: str | None = None
+    error: str | None = None
+    created_at: str | None = None # ISO format string
+    finished_at: str | None = None # ISO format string
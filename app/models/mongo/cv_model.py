@@ -1,11 +1,15 @@
+from typing import ClassVar
 from pydantic import Field
+from pymongo import IndexModel
 from app.models.mongo.base import BaseMongoModel
 from app.config import settings
 
 class CVModel(BaseMongoModel):
-    collection_name: str = settings.MONGO_CV_COLLECTION
+    collection_name: ClassVar[str] = settings.MONGO_CV_COLLECTION
+    indexes: ClassVar[list[IndexModel]] = [IndexModel([("content_hash", 1)]), IndexModel([("user_id", 1), ("_id", -1)])]
 
     user_id: str | None = None
     parsed_data: dict = Field(default_factory=dict)
     raw_text: str | None = None
     upload_date: str | None = None # ISO format string
+    content_hash: str | None = None # SHA-256 of the uploaded file, used to skip re-parsing identical uploads
@@ -1,9 +1,12 @@
+from typing import ClassVar
 from pydantic import Field
+from pymongo import IndexModel
 from app.models.mongo.base import BaseMongoModel
 from app.config import settings
 
 class FeedbackModel(BaseMongoModel):
-    collection_name: str = settings.MONGO_FEEDBACK_COLLECTION
+    collection_name: ClassVar[str] = settings.MONGO_FEEDBACK_COLLECTION
+    indexes: ClassVar[list[IndexModel]] = [IndexModel([("interview_id", 1)]), IndexModel([("user_id", 1)])]
 
     user_id: str | None = None
     interview_id: str | None = None
@@ -0,0 +1,14 @@
+from typing import ClassVar
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class InterviewArchiveModel(BaseMongoModel):
+    """Compressed conversation of a finished interview, same _id as in the interview collection"""
+    collection_name: ClassVar[str] = settings.MONGO_INTERVIEW_ARCHIVE_COLLECTION
+
+    codec: str = "zlib+json"
+    conversation: bytes # Compressed JSON list of {role: str, content: str}
+    message_count: int = 0
+    raw_bytes: int = 0 # Size of the uncompressed JSON
+    compressed_bytes: int = 0
+    archived_at: str | None = None # ISO format string
@@ -1,12 +1,24 @@
+from typing import ClassVar
 from pydantic import Field
+from pymongo import IndexModel
 from app.models.mongo.base import BaseMongoModel
 from app.config import settings
 
 class InterviewHistoryModel(BaseMongoModel):
-    collection_name: str = settings.MONGO_INTERVIEW_COLLECTION
+    collection_name: ClassVar[str] = settings.MONGO_INTERVIEW_COLLECTION
+    indexes: ClassVar[list[IndexModel]] = [IndexModel([("user_id", 1), ("_id", -1)]), IndexModel([("cv_id", 1)]),
+                                           IndexModel([("end_time", 1), ("last_activity_at", 1)])]
 
     user_id: str | None = None
     cv_id: str | None = None
-    conversation: list[dict] = Field(default_factory=list) # List of {role: str, content: str}
+    conversation: list[dict] = Field(default_factory=list) # List of {role: str, content: str}, moved to the archive once ended
     start_time: str | None = None # ISO format string
     end_time: str | None = None # ISO format string
+    version: int = 0 # Number of completed turns (one user + one agent message each), used for optimistic concurrency
+    summary: str | None = None # Rolling summary of the turns outside the prompt window
+    summarized_count: int = 0 # Number of leading messages folded into `summary`
+    summarized_chars: int = 0 # Characters of the original messages folded into `summary`
+    last_activity_at: str | None = None # ISO format string, last appended turn
+    archived: bool = False # Conversation compressed into InterviewArchiveModel
+    archive_raw_bytes: int | None = None
+    archive_compressed_bytes: int | None = None
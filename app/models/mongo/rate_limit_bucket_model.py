@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import ClassVar
+from pymongo import IndexModel
+from app.models.mongo.base import BaseMongoModel
+from app.config import settings
+
+class RateLimitBucketModel(BaseMongoModel):
+    """Token bucket of one user and endpoint class, shared by the API workers (_id is "<endpoint_class>:<user>")"""
+    collection_name: ClassVar[str] = settings.MONGO_RATE_LIMIT_COLLECTION
+    # Idle buckets are deleted by Mongo; a missing bucket is recreated full
+    indexes: ClassVar[list[IndexModel]] = [
+        IndexModel([("updated_at", 1)], expireAfterSeconds=settings.RATE_LIMIT_BUCKET_TTL_SECONDS),
+    ]
+
+    tokens: float
+    updated_at: datetime # BSON date, not an ISO string: the TTL index needs it
+    version: int = 1
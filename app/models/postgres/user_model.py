@@ -18,4 +18,5 @@ class User(Base):
     hashed_password = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_login = Column(DateTime, nullable=True)
\ No newline at end of file
+    last_login = Column(DateTime, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True) # Written in batches by ActivityBuffer
\ No newline at end of file
@@ -4,6 +4,16 @@ class CVParseResponse(BaseModel):
     cv_id: str
     parsed_data: dict
 
+class CVJobResponse(BaseModel):
+    job_id: str
+    status: str # queued | processing | done | failed
+    cv_id: str | None = None
+    parsed_data: dict | None = None # Set once the job is done
+    error: str | None = None
+    attempts: int = 0
+    created_at: str | None = None
+    finished_at: str | None = None
+
 class InterviewStartRequest(BaseModel):
     cv_id: str
     initial_prompt: str
@@ -16,7 +26,53 @@ class InterviewResponse(BaseModel):
     interview_id: str
     conversation: list[InterviewMessage]
     agent_response: str
+    version: int | None = None
+
+class InterviewDeltaResponse(BaseModel):
+    interview_id: str
+    version: int
+    messages: list[InterviewMessage] # Only the turn appended by this request
+    agent_response: str
+
+class InterviewSummary(BaseModel):
+    interview_id: str
+    cv_id: str | None = None
+    start_time: str | None = None
+    end_time: str | None = None
+    turn_count: int
+
+class InterviewDetail(BaseModel):
+    interview_id: str
+    cv_id: str | None = None
+    start_time: str | None = None
+    end_time: str | None = None
+    version: int | None = None
+    summary: str | None = None
+    archived: bool = False
+    conversation: list[InterviewMessage]
+
+class InterviewEndResponse(BaseModel):
+    interview_id: str
+    end_time: str
+    turn_count: int
+    raw_bytes: int # Size of the conversation before compression
+    compressed_bytes: int
+
+class InterviewListResponse(BaseModel):
+    items: list[InterviewSummary]
+    next_cursor: str | None = None
 
 class FeedbackRequest(BaseModel):
     interview_id: str
     feedback_content: dict
+
+class FeedbackBatchItemResult(BaseModel):
+    index: int
+    status: str # created | error
+    feedback_id: str | None = None
+    error: str | None = None
+
+class FeedbackBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[FeedbackBatchItemResult]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+class JobOfferPage(BaseModel):
+    items: list[dict]
+    total: int
+    limit: int
+    offset: int
+    fetched_at: str # ISO format string
+
+class JobMatch(BaseModel):
+    score: float # Cosine similarity between the CV and the offer, 0 to 1
+    offer: dict
+
+class JobMatchResponse(BaseModel):
+    cv_id: str
+    items: list[JobMatch]
+    fetched_at: str # ISO format string of the offer snapshot
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import bindparam, update
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import Counter, Gauge, Histogram
+from app.models.postgres.user_model import User
+
+logger = logging.getLogger(__name__)
+
+activity_flush_duration = Histogram("user_activity_flush_duration_seconds", "Time to write one batch of activity timestamps", ("outcome",))
+activity_flushed_users = Counter("user_activity_flushed_users_total", "Users whose activity was written to Postgres", ("outcome",))
+
+_users = User.__table__
+# executemany : une seule instruction préparée pour tout le lot.
+# updated_at est réaffecté à lui-même pour que onupdate ne le touche pas sur une simple visite.
+_seen_stmt = update(_users).where(_users.c.id == bindparam("user_id")).values(
+    last_seen_at=bindparam("seen_at"), updated_at=_users.c.updated_at)
+_login_stmt = update(_users).where(_users.c.id == bindparam("user_id")).values(
+    last_seen_at=bindparam("seen_at"), last_login=bindparam("login_at"), updated_at=bindparam("login_at"))
+
+class ActivityBuffer:
+    """Écriture différée des horodatages d'activité (last_seen_at, last_login).
+
+    Les requêtes authentifiées ne font que mettre à jour un dict en mémoire
+    (un seul timestamp par utilisateur, le plus récent) ; le buffer est vidé
+    toutes les ACTIVITY_FLUSH_INTERVAL secondes, plus tôt s'il dépasse
+    ACTIVITY_BUFFER_MAX_USERS, et à l'arrêt.
+    """
+
+    def __init__(self):
+        self._seen: dict[int, datetime] = {}
+        self._logins: dict[int, datetime] = {}
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def touch(self, user_id: int, login: bool = False):
+        now = datetime.utcnow()
+        self._seen[user_id] = now
+        if login:
+            self._logins[user_id] = now
+        if len(self._seen) >= settings.ACTIVITY_BUFFER_MAX_USERS:
+            self._wakeup.set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.ACTIVITY_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._seen:
+                return
+            seen, logins = self._seen, self._logins
+            self._seen, self._logins = {}, {}
+
+            visits = [{"user_id": user_id, "seen_at": seen_at} for user_id, seen_at in seen.items() if user_id not in logins]
+            login_rows = [{"user_id": user_id, "seen_at": seen[user_id], "login_at": login_at} for user_id, login_at in logins.items()]
+            outcome = "error"
+            start = asyncio.get_running_loop().time()
+            try:
+                async with AsyncSessionLocal() as session:
+                    if visits:
+                        await session.execute(_seen_stmt, visits)
+                    if login_rows:
+                        await session.execute(_login_stmt, login_rows)
+                    await session.commit()
+                outcome = "ok"
+            except Exception:
+                logger.exception("Failed to write activity for %d users", len(seen))
+                # Remis dans le buffer pour le prochain flush, sans écraser des timestamps plus récents
+                for user_id, seen_at in seen.items():
+                    self._seen.setdefault(user_id, seen_at)
+                for user_id, login_at in logins.items():
+                    self._logins.setdefault(user_id, login_at)
+            finally:
+                activity_flush_duration.observe(asyncio.get_running_loop().time() - start, outcome=outcome)
+                activity_flushed_users.inc(len(seen), outcome=outcome)
+
+activity_buffer = ActivityBuffer()
+
+Gauge("user_activity_buffer_users", "Users with activity waiting to be written", function=lambda: len(activity_buffer))
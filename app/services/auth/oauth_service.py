@@ -1,14 +1,29 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import JSON, case, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.exc import IntegrityError
+from app.clients.http import UpstreamClient, google_api
 from app.models.postgres.user_model import User
 from app.services.auth.service import create_access_token
+from app.services.auth.activity import activity_buffer
+from app.services.auth.security import invalidate_user
 from app.config import settings
 from datetime import datetime
-import httpx
 import json
 
+def _merge_provider(providers, provider: str):
+    """auth_providers (JSON) + provider, sans doublon, calculé côté Postgres"""
+    current = func.coalesce(cast(providers, JSONB), cast(literal("[]"), JSONB))
+    return case(
+        (current.op("?")(provider), providers),
+        else_=cast(current.op("||")(cast(literal(json.dumps([provider])), JSONB)), JSON),
+    )
+
+class OAuthAccountConflictError(Exception):
+    """Le compte du fournisseur ne peut être rattaché à aucun utilisateur sans conflit d'unicité"""
+
 class AuthProvider(ABC):
     """Interface pour les fournisseurs d'authentification"""
     
@@ -21,14 +36,18 @@ class AuthProvider(ABC):
         pass
 
 class GoogleAuthProvider(AuthProvider):
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
+    TOKEN_URL = "https://oauth2.googleapis.com/token"
+    USER_INFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+    def __init__(self, client_id: str, client_secret: str, redirect_uri: str, http: UpstreamClient = google_api):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
+        # Client partagé : les connexions TLS vers Google sont réutilisées d'un login à l'autre
+        self.http = http
     
     async def get_user_info(self, code: str) -> Dict[str, Any]:
         # Échanger le code contre un token
-        token_url = "https://oauth2.googleapis.com/token"
         token_data = {
             "client_id": self.client_id,
             "client_secret": self.client_secret,
@@ -36,18 +55,13 @@ class GoogleAuthProvider(AuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": self.redirect_uri,
         }
+        token_response = await self.http.request("POST", self.TOKEN_URL, operation="token", data=token_data)
+        tokens = token_response.json()
         
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(token_url, data=token_data)
-            token_response.raise_for_status()
-            tokens = token_response.json()
-            
-            # Récupérer les infos utilisateur
-            user_info_url = f"https://www.googleapis.com/oauth2/v2/userinfo?access_token={tokens['access_token']}"
-            user_response = await client.get(user_info_url)
-            user_response.raise_for_status()
-            
-            return user_response.json()
+        # Récupérer les infos utilisateur
+        user_response = await self.http.request("GET", self.USER_INFO_URL, operation="userinfo",
+                                                headers={"Authorization": f"Bearer {tokens['access_token']}"})
+        return user_response.json()
     
     def get_provider_name(self) -> str:
         return "google"
@@ -93,50 +107,63 @@ class OAuthService:
         raise ValueError(f"Provider {provider} not implemented")
     
     async def _handle_google_user(self, user_info: Dict, db: AsyncSession) -> User:
-        # Chercher par google_id ou email
-        query = select(User).where(
-            or_(
-                User.google_id == user_info["id"],
-                User.email == user_info["email"]
-            )
+        # Un seul aller-retour : INSERT ... ON CONFLICT (email) DO UPDATE ... RETURNING,
+        # sans violation d'unicité quand deux premiers logins arrivent en même temps
+        now = datetime.utcnow()
+        stmt = insert(User).values(
+            email=user_info["email"],
+            name=user_info["name"],
+            picture_url=user_info.get("picture"),
+            google_id=user_info["id"],
+            auth_providers=["google"],
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+            last_login=now,
+            candidate_mongo_id=None
         )
-        result = await db.execute(query)
-        user = result.scalar_one_or_none()
-        
-        if user:
-            # Mettre à jour les infos si nécessaire
-            if not user.google_id:
-                user.google_id = user_info["id"]
-            if user.auth_providers is None:
-                user.auth_providers = []
-            if "google" not in user.auth_providers:
-                user.auth_providers = user.auth_providers + ["google"]
-            user.last_login = datetime.utcnow()
-            user.updated_at = datetime.utcnow()
-            
-            # Mettre à jour le nom et photo si vides ou différents
-            if not user.name or user.name != user_info["name"]:
-                user.name = user_info["name"]
-            if not user.picture_url or user.picture_url != user_info.get("picture"):
-                user.picture_url = user_info.get("picture")
-        else:
-            # Créer nouvel utilisateur
-            user = User(
-                email=user_info["email"],
-                name=user_info["name"],
-                picture_url=user_info.get("picture"),
-                google_id=user_info["id"],
-                auth_providers=["google"],
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-                last_login=datetime.utcnow(),
-                candidate_mongo_id=None
-            )
-            db.add(user)
-        
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.email],
+            set_={
+                "google_id": func.coalesce(User.google_id, stmt.excluded.google_id),
+                "auth_providers": _merge_provider(User.auth_providers, "google"),
+                "name": stmt.excluded.name,
+                "picture_url": stmt.excluded.picture_url,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(User)
+        try:
+            user = await db.scalar(stmt, execution_options={"populate_existing": True})
+        except IntegrityError:
+            await db.rollback()
+            user = await self._relink_google_user(user_info, db, now)
         await db.commit()
-        await db.refresh(user)
+        # last_login des comptes existants part avec le prochain flush d'activité
+        activity_buffer.touch(user.id, login=True)
+        # Les principals en cache pour cet email ne reflètent plus la ligne
+        invalidate_user(user.email)
+        return user
+
+    async def _relink_google_user(self, user_info: Dict, db: AsyncSession, now: datetime) -> User:
+        # Conflit sur google_id : l'email du compte Google a changé depuis le dernier login
+        stmt = update(User).where(User.google_id == user_info["id"]).values(
+            email=user_info["email"],
+            name=user_info["name"],
+            picture_url=user_info.get("picture"),
+            auth_providers=_merge_provider(User.auth_providers, "google"),
+            updated_at=now
+        ).returning(User)
+        try:
+            user = await db.scalar(stmt, execution_options={"populate_existing": True})
+        except IntegrityError:
+            # Le nouvel email appartient déjà à un autre utilisateur
+            await db.rollback()
+            raise OAuthAccountConflictError(f"Google account {user_info['id']} conflicts with another user for {user_info['email']}")
+        if user is None:
+            # Le conflit ne portait pas sur google_id : on reprend l'utilisateur de cet email
+            user = await db.scalar(select(User).where(User.email == user_info["email"]))
+        if user is None:
+            raise OAuthAccountConflictError(f"Google account {user_info['id']} could not be linked to {user_info['email']}")
         return user
 
 oauth_service = OAuthService()
\ No newline at end of file
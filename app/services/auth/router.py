@@ -4,14 +4,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import AsyncSessionLocal
 from app.schemas.auth_schemas import Token, AuthResponse, TokenValidationRequest, TokenValidationResponse
 from app.services.auth import service
-from app.services.auth.oauth_service import oauth_service
+from app.services.auth.activity import activity_buffer
+from app.services.auth.oauth_service import OAuthAccountConflictError, oauth_service
 from app.services.auth.security import get_current_user
 from fastapi.security import OAuth2PasswordRequestForm
 from app.config import settings
 import urllib.parse
 import json
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -23,13 +26,17 @@ async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
     db: AsyncSession = Depends(get_db)
 ):
-    user = await service.authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await service.authenticate_user(db, form_data.username, form_data.password)
+    except service.HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     if not user:
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    activity_buffer.touch(user.id, login=True)
     access_token = service.create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -77,8 +84,11 @@ async def oauth_callback(
         )
         return RedirectResponse(success_url)
         
+    except OAuthAccountConflictError as e:
+        logger.warning("OAuth account conflict: %s", e)
+        return RedirectResponse(f"{settings.FRONTEND_ERROR_URL}?error=account_conflict")
     except Exception as e:
-        print(f"OAuth callback error: {e}")  # Log pour debug
+        logger.exception("OAuth callback error: %s", e)
         error_url = f"{settings.FRONTEND_ERROR_URL}?error=auth_failed"
         return RedirectResponse(error_url)
 
@@ -105,5 +115,5 @@ async def validate_token(
             }
         )
     except Exception as e:
-        print(f"Token validation error: {e}")
+        logger.info("Token validation error: %s", e)
         return TokenValidationResponse(valid=False, user=None)
\ No newline at end of file
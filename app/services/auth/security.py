@@ -1,20 +1,65 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
 from app.core.database import AsyncSessionLocal
 from app.models.postgres.user_model import User
 from app.schemas.auth_schemas import TokenData
+from app.services.auth.activity import activity_buffer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Utilisateur authentifié, détaché de la session SQLAlchemy"""
+    id: int
+    email: str
+    name: str | None = None
+    picture_url: str | None = None
+    google_id: str | None = None
+    candidate_mongo_id: str | None = None
+    is_active: bool = True
+    created_at: datetime | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            picture_url=user.picture_url,
+            google_id=user.google_id,
+            candidate_mongo_id=user.candidate_mongo_id,
+            is_active=user.is_active if user.is_active is not None else True,
+            created_at=user.created_at,
+        )
+
+# token -> Principal ; une entrée n'expire jamais après le `exp` du token
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+Counter("auth_principal_cache_lookups_total", "Principal cache lookups", ("result",),
+        function=lambda: {("hit",): principal_cache.hits, ("miss",): principal_cache.misses})
+
+def invalidate_user(email: str):
+    principal_cache.discard_where(lambda principal: principal.email == email)
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        activity_buffer.touch(principal.id)
+        return principal
+
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -36,4 +81,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+
+    principal = Principal.from_user(user)
+    if "exp" in payload:
+        principal_cache.set(token, principal, ttl=payload["exp"] - time.time())
+    activity_buffer.touch(principal.id)
+    return principal
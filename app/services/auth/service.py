@@ -1,27 +1,67 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
+from app.core.metrics import Histogram
 from app.models.postgres.user_model import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+login_duration = Histogram("auth_login_duration_seconds", "Password login latency", ("outcome",))
+
+# bcrypt is CPU-bound: run it on a dedicated pool so it never blocks the event
+# loop, and reject new work once AUTH_HASH_MAX_PENDING operations are queued.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(settings.AUTH_HASH_MAX_PENDING)
+
+class HashingBusyError(Exception):
+    """Too many password hashing operations are already queued"""
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def _run_hashing(func, *args):
+    if _hash_slots.locked():
+        raise HashingBusyError("Authentication is busy, please retry")
+    async with _hash_slots:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+def shutdown_hashing():
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
-    user = await db.execute(User.__table__.select().where(User.email == email))
-    user = user.first()
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
+    start = time.perf_counter()
+    outcome = "failure"
+    try:
+        user = await db.execute(User.__table__.select().where(User.email == email))
+        user = user.first()
+        if not user or not user.hashed_password:
+            # Same bcrypt cost as a real check so unknown emails cannot be told apart by timing
+            await _run_hashing(pwd_context.dummy_verify)
+            return None
+        if not await verify_password_async(password, user.hashed_password):
+            return None
+        outcome = "success"
+        return user
+    except HashingBusyError:
+        outcome = "busy"
+        raise
+    finally:
+        login_duration.observe(time.perf_counter() - start, outcome=outcome)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.database import mongo_db
 from app.schemas.contact_schemas import ContactForm
 from app.services.contact import service
 
 router = APIRouter()
 
-@router.post("/")
-async def send_contact_form(form_data: ContactForm):
+async def get_mongo_db():
+    return mongo_db
+
+@router.post("/", status_code=202)
+async def send_contact_form(form_data: ContactForm, db: AsyncIOMotorDatabase = Depends(get_mongo_db)):
     try:
-        await service.send_contact_email(form_data)
-        return {"message": "Contact form submitted successfully"}
+        message_id = await service.enqueue_contact_email(db, form_data)
+        return {"message": "Contact form submitted successfully", "message_id": message_id}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
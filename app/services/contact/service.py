@@ -1,26 +1,171 @@
+import asyncio
+import logging
+import random
 import smtplib
+import time
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 from app.config import settings
+from app.core.metrics import Counter
+from app.models.mongo.contact_message_model import ContactMessageModel
 from app.schemas.contact_schemas import ContactForm
 
-async def send_contact_email(form_data: ContactForm):
+logger = logging.getLogger(__name__)
+
+contact_deliveries = Counter("contact_email_deliveries_total", "Contact email delivery attempts", ("outcome",))
+
+def build_message(entry: dict) -> MIMEMultipart:
     sender_email = settings.GMAIL_USER
-    sender_password = settings.GMAIL_PASSWORD
     receiver_email = settings.GMAIL_USER # Send to self for now
 
     message = MIMEMultipart()
     message["From"] = sender_email
     message["To"] = receiver_email
-    message["Subject"] = f"Contact Form: {form_data.subject} from {form_data.email}"
+    message["Subject"] = f"Contact Form: {entry['subject']} from {entry['email']}"
 
-    body = f"Name: {form_data.name}\nEmail: {form_data.email}\n\nMessage:\n{form_data.message}"
+    body = f"Name: {entry['name']}\nEmail: {entry['email']}\n\nMessage:\n{entry['message']}"
     message.attach(MIMEText(body, "plain"))
+    return message
+
+async def enqueue_contact_email(db: AsyncIOMotorDatabase, form_data: ContactForm) -> str:
+    now = datetime.utcnow().isoformat()
+    entry = ContactMessageModel(**form_data.model_dump(), next_attempt_at=now, created_at=now)
+    message_id = await ContactMessageModel.create(db, ContactMessageModel.collection_name, entry.model_dump(exclude={"id"}))
+    contact_mailer.wake()
+    return message_id
+
+class ContactMailer:
+    """Background delivery of the contact outbox over a reused SMTP connection.
+
+    Messages are persisted before the HTTP response, claimed with a lease so
+    several workers can share the outbox, and retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self._db: AsyncIOMotorDatabase | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._smtp: smtplib.SMTP | None = None
+        self._smtp_used_at = 0.0
+
+    def start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._disconnect)
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            # Cleared before claiming: a message queued meanwhile is either
+            # claimed below or wakes the wait
+            self._wakeup.clear()
+            try:
+                batch = await self._claim_batch()
+                if batch:
+                    results = await asyncio.to_thread(self._send_batch, batch)
+                    await self._record_results(batch, results)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Contact mailer iteration failed")
+
+            if self._smtp is not None and time.monotonic() - self._smtp_used_at > settings.SMTP_IDLE_TIMEOUT:
+                await asyncio.to_thread(self._disconnect)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.CONTACT_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim_batch(self) -> list[dict]:
+        collection = self._db[ContactMessageModel.collection_name]
+        now = datetime.utcnow()
+        lease_until = (now + timedelta(seconds=settings.CONTACT_LEASE_SECONDS)).isoformat()
+        query = {"$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now.isoformat()}},
+            # Lease expired: the worker that claimed it died mid-send
+            {"status": "sending", "lease_until": {"$lte": now.isoformat()}},
+        ]}
+        batch = []
+        for _ in range(settings.CONTACT_BATCH_SIZE):
+            entry = await collection.find_one_and_update(
+                query, {"$set": {"status": "sending", "lease_until": lease_until}},
+                sort=[("next_attempt_at", 1)], return_document=ReturnDocument.AFTER,
+            )
+            if entry is None:
+                break
+            batch.append(entry)
+        return batch
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp_class = smtplib.SMTP_SSL if settings.SMTP_USE_SSL else smtplib.SMTP
+            smtp = smtp_class(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+            if settings.GMAIL_PASSWORD:
+                smtp.login(settings.GMAIL_USER, settings.GMAIL_PASSWORD)
+            self._smtp = smtp
+        return self._smtp
+
+    def _disconnect(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _send(self, message: MIMEMultipart):
+        try:
+            self._connect().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped the reused connection: reconnect once
+            self._disconnect()
+            self._connect().send_message(message)
+        self._smtp_used_at = time.monotonic()
+
+    def _send_batch(self, batch: list[dict]) -> list[str | None]:
+        results = []
+        for entry in batch:
+            try:
+                self._send(build_message(entry))
+                results.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                self._disconnect()
+                results.append(str(e))
+        return results
+
+    async def _record_results(self, batch: list[dict], results: list[str | None]):
+        collection = self._db[ContactMessageModel.collection_name]
+        now = datetime.utcnow()
+        for entry, error in zip(batch, results):
+            if error is None:
+                contact_deliveries.inc(outcome="sent")
+                update = {"status": "sent", "sent_at": now.isoformat(), "lease_until": None, "last_error": None}
+            else:
+                attempts = entry.get("attempts", 0) + 1
+                if attempts >= settings.CONTACT_MAX_ATTEMPTS:
+                    contact_deliveries.inc(outcome="failed")
+                    logger.error("Giving up on contact message %s: %s", entry["_id"], error)
+                    update = {"status": "failed", "attempts": attempts, "last_error": error, "lease_until": None}
+                else:
+                    contact_deliveries.inc(outcome="retry")
+                    delay = settings.CONTACT_RETRY_BASE_SECONDS * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+                    update = {"status": "pending", "attempts": attempts, "last_error": error, "lease_until": None,
+                              "next_attempt_at": (now + timedelta(seconds=delay)).isoformat()}
+            await collection.update_one({"_id": entry["_id"]}, {"$set": update})
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(sender_email, sender_password)
-            smtp.send_message(message)
-        return {"message": "Email sent successfully"}
-    except Exception as e:
-        raise Exception(f"Failed to send email: {e}")
+contact_mailer = ContactMailer()
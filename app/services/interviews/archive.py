@@ -0,0 +1,140 @@
+"""Compressed archival of finished interviews.
+
+Ending an interview moves its conversation out of the hot collection into
+InterviewArchiveModel as zlib-compressed JSON; the hot document keeps the
+metadata and rolling summary used by listings. Interviews left without a turn
+for INTERVIEW_ABANDONED_AFTER_HOURS are compacted in batches:
+
+    python -m app.services.interviews.archive compact [--idle-hours 24] [--limit 1000]
+    python -m app.services.interviews.archive report
+"""
+import argparse
+import asyncio
+import json
+import zlib
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.core.metrics import Counter
+from app.models.mongo.interview_archive_model import InterviewArchiveModel
+from app.models.mongo.interview_history_model import InterviewHistoryModel
+
+CODEC = "zlib+json"
+
+archived_interviews = Counter("interview_archived_total", "Interviews moved to the compressed archive", ("reason",))
+archive_bytes = Counter("interview_archive_bytes_total", "Conversation bytes before and after archive compression", ("kind",))
+
+def compress_conversation(conversation: list[dict]) -> tuple[bytes, int]:
+    raw = json.dumps(conversation, separators=(",", ":"), ensure_ascii=False).encode()
+    return zlib.compress(raw, settings.INTERVIEW_ARCHIVE_COMPRESSION_LEVEL), len(raw)
+
+def decompress_conversation(archive: dict) -> list[dict]:
+    if archive.get("codec", CODEC) != CODEC:
+        raise ValueError(f"Unknown interview archive codec {archive['codec']}")
+    return json.loads(zlib.decompress(archive["conversation"]))
+
+async def load_conversation(db: AsyncIOMotorDatabase, interview: dict) -> list[dict]:
+    """Conversation of a hot interview document, read from the archive if it was compacted"""
+    if not interview.get("archived"):
+        return interview.get("conversation", [])
+    archive = await InterviewArchiveModel.get(db, InterviewArchiveModel.collection_name, {"_id": interview["_id"]})
+    if archive is None:
+        raise ValueError("Interview archive not found")
+    return decompress_conversation(archive)
+
+async def archive_interview(db: AsyncIOMotorDatabase, interview: dict, reason: str, end_time: str | None = None,
+                            user_id: str | None = None) -> dict | None:
+    """Compress the conversation of `interview` (a full hot document) into the archive.
+
+    The archive is written first, then the hot document is switched over under
+    its version guard (and owner, when `user_id` is given); returns the fields
+    set on the hot document, or None if a turn was appended concurrently.
+    """
+    conversation = interview.get("conversation", [])
+    blob, raw_bytes = compress_conversation(conversation)
+    now = datetime.utcnow().isoformat()
+    archive = InterviewArchiveModel(conversation=blob, message_count=len(conversation), raw_bytes=raw_bytes,
+                                    compressed_bytes=len(blob), archived_at=now)
+    # Upsert: rerunning after a crash between the two writes is harmless
+    await db[InterviewArchiveModel.collection_name].replace_one(
+        {"_id": interview["_id"]}, archive.model_dump(exclude={"id"}), upsert=True)
+
+    if "version" in interview:
+        version_guard = {"version": interview["version"]}
+    else:
+        version_guard = {"version": {"$exists": False}}
+    owner = {"user_id": user_id} if user_id is not None else {}
+    update = {
+        "end_time": end_time or interview.get("end_time") or now,
+        "archived": True,
+        "archive_raw_bytes": raw_bytes,
+        "archive_compressed_bytes": len(blob),
+        # Legacy documents: freeze the turn count used by listings
+        "version": interview.get("version", len(conversation) // 2),
+    }
+    result = await db[InterviewHistoryModel.collection_name].update_one(
+        {"_id": interview["_id"], "archived": {"$ne": True}, **owner, **version_guard},
+        {"$set": update, "$unset": {"conversation": ""}},
+    )
+    if result.matched_count == 0:
+        return None
+    archived_interviews.inc(reason=reason)
+    archive_bytes.inc(raw_bytes, kind="raw")
+    archive_bytes.inc(len(blob), kind="compressed")
+    return update
+
+async def compact_abandoned_interviews(db: AsyncIOMotorDatabase, idle_hours: float | None = None, limit: int = 1000) -> dict:
+    """Archive interviews without a new turn for `idle_hours`; returns a summary of the run"""
+    idle_hours = settings.INTERVIEW_ABANDONED_AFTER_HOURS if idle_hours is None else idle_hours
+    cutoff = (datetime.utcnow() - timedelta(hours=idle_hours)).isoformat()
+    query = {"end_time": None, "archived": {"$ne": True}, "$or": [
+        {"last_activity_at": {"$lte": cutoff}},
+        # Created before last_activity_at existed
+        {"last_activity_at": {"$exists": False}, "start_time": {"$lte": cutoff}},
+    ]}
+    stats = {"archived": 0, "skipped": 0, "raw_bytes": 0, "compressed_bytes": 0}
+    async for interview in InterviewHistoryModel.iterate(db, InterviewHistoryModel.collection_name, query, limit=limit):
+        # end_time = last activity: the interview ended when the candidate stopped answering
+        end_time = interview.get("last_activity_at") or interview.get("start_time")
+        update = await archive_interview(db, interview, reason="abandoned", end_time=end_time)
+        if update is None:
+            stats["skipped"] += 1
+            continue
+        stats["archived"] += 1
+        stats["raw_bytes"] += update["archive_raw_bytes"]
+        stats["compressed_bytes"] += update["archive_compressed_bytes"]
+    return stats
+
+async def storage_report(db: AsyncIOMotorDatabase) -> dict:
+    """Storage saved by the archive across all compacted interviews"""
+    pipeline = [
+        {"$match": {"archived": True}},
+        {"$group": {"_id": None, "interviews": {"$sum": 1}, "raw_bytes": {"$sum": "$archive_raw_bytes"},
+                    "compressed_bytes": {"$sum": "$archive_compressed_bytes"}}},
+    ]
+    totals = {"interviews": 0, "raw_bytes": 0, "compressed_bytes": 0}
+    async for row in db[InterviewHistoryModel.collection_name].aggregate(pipeline):
+        totals.update({key: row[key] for key in totals})
+    totals["saved_bytes"] = totals["raw_bytes"] - totals["compressed_bytes"]
+    totals["ratio"] = round(totals["compressed_bytes"] / totals["raw_bytes"], 3) if totals["raw_bytes"] else None
+    return totals
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Compact abandoned interviews into the compressed archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser("compact")
+    compact.add_argument("--idle-hours", type=float, default=settings.INTERVIEW_ABANDONED_AFTER_HOURS)
+    compact.add_argument("--limit", type=int, default=1000)
+    subparsers.add_parser("report")
+    args = parser.parse_args(argv)
+
+    from app.core.database import mongo_db
+    if args.command == "compact":
+        result = asyncio.run(compact_abandoned_interviews(mongo_db, args.idle_hours, args.limit))
+        result["saved_bytes"] = result["raw_bytes"] - result["compressed_bytes"]
+    else:
+        result = asyncio.run(storage_report(mongo_db))
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
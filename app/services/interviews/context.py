@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from app.config import settings
+from app.core.metrics import Counter
+
+prompt_full_chars = Counter("interview_prompt_full_chars_total", "Characters a full-history prompt would have contained")
+prompt_sent_chars = Counter("interview_prompt_sent_chars_total", "Characters actually sent to the model")
+prompt_saved_chars = Counter("interview_prompt_saved_chars_total", "Characters saved by the bounded context window")
+
+@dataclass
+class PromptContext:
+    prompt: str
+    summary: str | None
+    summarized_count: int
+    summarized_chars: int
+
+def format_message(message: dict) -> str:
+    return f"{message['role']}: {message['content']}"
+
+def summarize_message(message: dict) -> str:
+    # Extractive summary: first sentence of the message, truncated
+    content = " ".join(str(message["content"]).split())
+    sentence = content.split(". ", 1)[0]
+    limit = settings.INTERVIEW_SUMMARY_LINE_CHARS
+    if len(sentence) > limit:
+        sentence = sentence[:limit - 1].rstrip() + "…"
+    return f"{message['role']}: {sentence}"
+
+def fold_summary(summary: str | None, messages: list[dict]) -> str:
+    lines = summary.splitlines() if summary else []
+    lines.extend(summarize_message(message) for message in messages)
+    size = sum(len(line) + 1 for line in lines)
+    while len(lines) > 1 and size > settings.INTERVIEW_SUMMARY_MAX_CHARS:
+        size -= len(lines.pop(0)) + 1
+    return "\n".join(lines)
+
+def build_context(messages: list[dict], first_index: int, summary: str | None = None,
+                  summarized_count: int = 0, summarized_chars: int = 0) -> PromptContext:
+    """Build the model prompt from the tail of a conversation.
+
+    `messages` is the tail of the conversation (including the new user message)
+    and `first_index` the absolute position of its first element. The last
+    INTERVIEW_CONTEXT_MAX_TURNS turns are kept verbatim within
+    INTERVIEW_CONTEXT_MAX_CHARS; messages that fall out of the window are folded
+    into the cached rolling summary, which is never recomputed from scratch.
+    """
+    lines = [format_message(message) for message in messages]
+
+    keep_from = max(0, len(messages) - settings.INTERVIEW_CONTEXT_MAX_TURNS * 2, summarized_count - first_index)
+    keep_from = min(keep_from, len(messages) - 1)
+    size = sum(len(line) + 1 for line in lines[keep_from:])
+    while keep_from < len(messages) - 1 and size > settings.INTERVIEW_CONTEXT_MAX_CHARS:
+        size -= len(lines[keep_from]) + 1
+        keep_from += 1
+
+    evicted = range(max(0, summarized_count - first_index), keep_from)
+    if evicted:
+        summary = fold_summary(summary, [messages[i] for i in evicted])
+        summarized_chars += sum(len(lines[i]) + 1 for i in evicted)
+        summarized_count = first_index + keep_from
+
+    window = "\n".join(lines[keep_from:])
+    prompt = f"Summary of the earlier conversation:\n{summary}\n\n{window}" if summary else window
+
+    full_chars = summarized_chars + len(window)
+    prompt_full_chars.inc(full_chars)
+    prompt_sent_chars.inc(len(prompt))
+    prompt_saved_chars.inc(max(0, full_chars - len(prompt)))
+
+    return PromptContext(prompt=prompt, summary=summary, summarized_count=summarized_count, summarized_chars=summarized_chars)
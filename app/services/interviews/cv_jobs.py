@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi import UploadFile
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from starlette.datastructures import Headers
+from app.config import settings
+from app.core.metrics import Counter, Gauge
+from app.models.mongo.base import object_id
+from app.models.mongo.cv_job_model import CVJobModel
+from app.models.mongo.cv_model import CVModel
+from app.services.interviews.service import _find_parsed_cv, _hash_upload, process_cv_upload
+
+logger = logging.getLogger(__name__)
+
+cv_jobs = Counter("cv_jobs_total", "CV parsing jobs by outcome", ("outcome",))
+
+class CVQueueFullError(Exception):
+    """Too many CV jobs are waiting, the upload is rejected"""
+
+def _save_upload(source, path: str):
+    source.seek(0)
+    with open(path, "wb") as target:
+        shutil.copyfileobj(source, target, settings.CV_UPLOAD_CHUNK_SIZE)
+
+def _remove_upload(path: str | None):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+async def submit_cv_job(db: AsyncIOMotorDatabase, cv_file: UploadFile, user_id: str, force_reparse: bool = False) -> dict:
+    """Persist the upload and a job record; the parse itself runs in CVJobQueue"""
+    content_hash = await _hash_upload(cv_file)
+    now = datetime.utcnow().isoformat()
+    job = CVJobModel(user_id=user_id, filename=cv_file.filename, content_type=cv_file.content_type,
+                     content_hash=content_hash, force_reparse=force_reparse, next_attempt_at=now, created_at=now)
+
+    # Already parsed: no model call needed, the job is born finished
+    if not force_reparse and await _find_parsed_cv(db, content_hash) is not None:
+        cv_id, parsed_data = await process_cv_upload(db, cv_file, user_id, content_hash=content_hash)
+        job.status, job.cv_id, job.finished_at = "done", cv_id, now
+        cv_jobs.inc(outcome="deduplicated")
+        job.id = await CVJobModel.create(db, CVJobModel.collection_name, job.model_dump(exclude={"id"}))
+        return {**job.model_dump(), "parsed_data": parsed_data}
+
+    collection = db[CVJobModel.collection_name]
+    pending = await collection.count_documents({"status": {"$in": ["queued", "processing"]}})
+    if pending >= settings.CV_JOB_MAX_PENDING:
+        cv_jobs.inc(outcome="rejected")
+        raise CVQueueFullError(f"{pending} CV jobs are already waiting, please retry later")
+
+    job_id = ObjectId()
+    job.file_path = os.path.join(settings.CV_JOB_STORAGE_DIR, str(job_id))
+    await asyncio.to_thread(_save_upload, cv_file.file, job.file_path)
+    job.size = os.path.getsize(job.file_path)
+    await collection.insert_one({"_id": job_id, **job.model_dump(exclude={"id"})})
+    cv_jobs.inc(outcome="queued")
+    cv_job_queue.wake()
+    job.id = str(job_id)
+    return job.model_dump()
+
+async def get_cv_job(db: AsyncIOMotorDatabase, job_id: str, user_id: str) -> dict | None:
+    """Job status for its owner, with the parsed CV once the job is done"""
+    job = await CVJobModel.get(db, CVJobModel.collection_name, {"_id": object_id(job_id), "user_id": user_id})
+    if job and job["status"] == "done":
+        cv = await CVModel.get(db, CVModel.collection_name, {"_id": object_id(job["cv_id"])}, {"parsed_data": 1})
+        job["parsed_data"] = cv.get("parsed_data") if cv else None
+    return job
+
+class CVJobQueue:
+    """Bounded pool of workers parsing queued CVs.
+
+    Jobs live in Mongo and are claimed with a lease, so they survive a
+    restart (an expired lease is claimed again) and several API processes can
+    share the queue. CV_JOB_WORKERS caps the parses each process sends to the
+    model API at once.
+    """
+
+    def __init__(self):
+        self._db: AsyncIOMotorDatabase | None = None
+        self._workers: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self.busy = 0
+
+    def start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        os.makedirs(settings.CV_JOB_STORAGE_DIR, exist_ok=True)
+        self._workers = [asyncio.create_task(self._run()) for _ in range(settings.CV_JOB_WORKERS)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        # Interrupted jobs keep their lease and are picked up again once it expires
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            # Cleared before claiming: a job submitted meanwhile is either
+            # claimed below or wakes the wait
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+                if job is not None:
+                    await self._process(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("CV job worker iteration failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.CV_JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> dict | None:
+        now = datetime.utcnow()
+        lease_until = (now + timedelta(seconds=settings.CV_JOB_LEASE_SECONDS)).isoformat()
+        query = {"$or": [
+            {"status": "queued", "next_attempt_at": {"$lte": now.isoformat()}},
+            # Lease expired: the process handling it stopped or crashed
+            {"status": "processing", "lease_until": {"$lte": now.isoformat()}},
+        ]}
+        return await self._db[CVJobModel.collection_name].find_one_and_update(
+            query, {"$set": {"status": "processing", "lease_until": lease_until}, "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", 1)], return_document=ReturnDocument.AFTER,
+        )
+
+    async def _process(self, job: dict):
+        collection = self._db[CVJobModel.collection_name]
+        self.busy += 1
+        try:
+            with open(job["file_path"], "rb") as file:
+                upload = UploadFile(file, size=job.get("size"), filename=job.get("filename"),
+                                    headers=Headers({"content-type": job.get("content_type") or "application/octet-stream"}))
+                cv_id, _ = await process_cv_upload(self._db, upload, job["user_id"], job.get("force_reparse", False),
+                                                   content_hash=job["content_hash"])
+        except FileNotFoundError:
+            await self._finish(job, {"status": "failed", "error": "Uploaded file is no longer available"}, "failed")
+            return
+        except Exception as e:
+            now = datetime.utcnow()
+            if job["attempts"] >= settings.CV_JOB_MAX_ATTEMPTS:
+                logger.error("Giving up on CV job %s: %s", job["_id"], e)
+                await self._finish(job, {"status": "failed", "error": str(e)}, "failed")
+            else:
+                cv_jobs.inc(outcome="retry")
+                delay = settings.CV_JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1) * random.uniform(0.5, 1.5)
+                await collection.update_one({"_id": job["_id"]}, {"$set": {
+                    "status": "queued", "error": str(e), "lease_until": None,
+                    "next_attempt_at": (now + timedelta(seconds=delay)).isoformat()}})
+            return
+        finally:
+            self.busy -= 1
+        await self._finish(job, {"status": "done", "cv_id": cv_id, "error": None}, "done")
+
+    async def _finish(self, job: dict, update: dict, outcome: str):
+        cv_jobs.inc(outcome=outcome)
+        await self._db[CVJobModel.collection_name].update_one(
+            {"_id": job["_id"]}, {"$set": {**update, "lease_until": None, "finished_at": datetime.utcnow().isoformat()}})
+        await asyncio.to_thread(_remove_upload, job.get("file_path"))
+
+cv_job_queue = CVJobQueue()
+
+Gauge("cv_job_workers_busy", "CV job workers currently parsing", function=lambda: cv_job_queue.busy)
@@ -0,0 +1,120 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import UploadFile
+from pypdf import PdfReader
+from app.config import settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+pdf_extract_duration = Histogram("pdf_extract_duration_seconds", "Local PDF text extraction time", ("outcome",))
+pdf_extract_pages = Counter("pdf_extract_pages_total", "PDF pages whose text was extracted")
+
+class ExtractionTimeout(Exception):
+    """The document exceeded PDF_EXTRACT_TIMEOUT_SECONDS"""
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout()
+
+def _spool_to_disk(source) -> str:
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="cv-", suffix=".pdf", delete=False) as target:
+        shutil.copyfileobj(source, target, settings.CV_UPLOAD_CHUNK_SIZE)
+    return target.name
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def extract_pdf_text(source: str | bytes, max_pages: int, max_chars: int, timeout: float) -> tuple[str, int]:
+    """Runs in a pool process: text of the first `max_pages` pages, at most `max_chars` characters.
+
+    SIGALRM bounds the whole document, including a single pathological page.
+    """
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        reader = PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+        parts = []
+        size = 0
+        for page in reader.pages[:max_pages]:
+            text = page.extract_text() or ""
+            parts.append(text)
+            size += len(text)
+            if size >= max_chars:
+                break
+        return "\n".join(parts)[:max_chars], len(parts)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+# Bornes : au plus PDF_EXTRACT_WORKERS process, et PDF_EXTRACT_MAX_PENDING documents en attente
+_executor: ProcessPoolExecutor | None = None
+_slots = asyncio.Semaphore(settings.PDF_EXTRACT_MAX_PENDING)
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking the running event loop and its threads is not safe
+        _executor = ProcessPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+def shutdown_extraction():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def extract_text(cv_file: UploadFile) -> str | None:
+    """Text of an uploaded PDF, or None when it is not a PDF or extraction fails or times out"""
+    if not settings.PDF_EXTRACT_ENABLED:
+        return None
+    await cv_file.seek(0)
+    is_pdf = await cv_file.read(5) == b"%PDF-"
+    await cv_file.seek(0)
+    if not is_pdf:
+        return None
+
+    outcome = "error"
+    start = time.perf_counter()
+    temporary = None
+    async with _slots:
+        try:
+            # The worker opens the file itself: a file on disk (queued CV jobs) is
+            # passed by path, an upload held in memory is first copied to a temporary file
+            path = getattr(cv_file.file, "name", None)
+            if not (isinstance(path, str) and os.path.isfile(path)):
+                path = temporary = await asyncio.to_thread(_spool_to_disk, cv_file.file)
+                await cv_file.seek(0)
+            future = asyncio.get_running_loop().run_in_executor(
+                _get_executor(), extract_pdf_text, path, settings.PDF_EXTRACT_MAX_PAGES,
+                settings.PDF_EXTRACT_MAX_CHARS, settings.PDF_EXTRACT_TIMEOUT_SECONDS)
+            # Backstop in case the alarm cannot fire (process stuck in native code)
+            text, pages = await asyncio.wait_for(future, settings.PDF_EXTRACT_TIMEOUT_SECONDS + 5)
+            outcome = "ok"
+            pdf_extract_pages.inc(pages)
+            return text.replace("\x00", "").strip() or None
+        except (ExtractionTimeout, asyncio.TimeoutError):
+            outcome = "timeout"
+            logger.warning("PDF text extraction of %s timed out", cv_file.filename)
+        except BrokenProcessPool:
+            logger.warning("PDF extraction pool broke, recreating it")
+            shutdown_extraction()
+        except Exception as e:
+            logger.warning("PDF text extraction of %s failed: %s", cv_file.filename, e)
+        finally:
+            pdf_extract_duration.observe(time.perf_counter() - start, outcome=outcome)
+            if temporary is not None:
+                _remove(temporary)
+    return None
@@ -1,45 +1,278 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+import json
+import logging
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, UploadFile, File, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.clients.resilience import CircuitOpenError
+from app.core.admission import AdmissionRejectedError, model_admission, retry_after_header
 from app.core.database import mongo_db
-from app.schemas.interview_schemas import CVParseResponse, InterviewStartRequest, InterviewResponse, FeedbackRequest
-from app.services.interviews import service
-from app.services.auth.security import get_current_user # Assuming user authentication is required
-from app.schemas.interview_schemas import CVParseResponse, InterviewStartRequest, InterviewResponse, FeedbackRequest, InterviewMessage 
+from app.core.idempotency import IdempotencyKeyReusedError, IdempotencyStore, fingerprint
+from app.services.interviews import cv_jobs, service
+from app.services.auth.security import Principal, get_current_user
+from app.schemas.interview_schemas import CVJobResponse, InterviewStartRequest, InterviewResponse, FeedbackRequest, InterviewMessage, InterviewDeltaResponse, InterviewDetail, InterviewEndResponse, InterviewListResponse, FeedbackBatchResponse
+from app.config import settings
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Idempotency-Key -> response of an already handled /simulation/start or /continue
+interview_requests = IdempotencyStore(maxsize=settings.IDEMPOTENCY_MAX_KEYS, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
 
 async def get_mongo_db():
     return mongo_db
 
-@router.post("/cv", response_model=CVParseResponse)
-async def upload_cv(cv: UploadFile = File(...), db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: dict = Depends(get_current_user)):
+def _model_unavailable(e: CircuitOpenError) -> HTTPException:
+    return HTTPException(status_code=503, detail=f"Model service temporarily unavailable: {e}",
+                         headers={"Retry-After": str(max(1, round(e.retry_after)))})
+
+def _rate_limited(e: AdmissionRejectedError) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers=retry_after_header(e))
+
+def admitted(endpoint_class: str):
+    """Dependency: the authenticated user, once within their rate limit for `endpoint_class`"""
+    async def dependency(current_user: Principal = Depends(get_current_user)) -> Principal:
+        try:
+            await model_admission.check(endpoint_class, str(current_user.id))
+        except AdmissionRejectedError as e:
+            raise _rate_limited(e)
+        return current_user
+    return dependency
+
+async def _interview_turn(response: Response, user_id: str, scope: str, idempotency_key: str | None, request_fingerprint: str, func):
+    """Rate limit and model slot around `func`, run once per Idempotency-Key.
+
+    A replay answers from the stored response: no rate limit token, model
+    call or Mongo write.
+    """
+    async def admitted_call():
+        await model_admission.check("interview", user_id)
+        async with model_admission.model_slot(user_id):
+            return await func()
+
+    if idempotency_key is None:
+        return await admitted_call()
+    result, replayed = await interview_requests.run(f"{user_id}:{scope}", idempotency_key, request_fingerprint, admitted_call)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+def _job_response(job: dict) -> CVJobResponse:
+    return CVJobResponse(job_id=str(job.get("_id") or job.get("id")), **{k: v for k, v in job.items() if k in CVJobResponse.model_fields})
+
+@router.post("/cv", response_model=CVJobResponse, status_code=202)
+async def upload_cv(response: Response, cv: UploadFile = File(...), reparse: bool = False, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(admitted("cv"))):
+    """Queue the CV for parsing; poll the Location URL until the job is done"""
     try:
-        cv_id, parsed_data = await service.process_cv_upload(db, cv, str(current_user["id"]))
-        return CVParseResponse(cv_id=cv_id, parsed_data=parsed_data)
+        job = await cv_jobs.submit_cv_job(db, cv, str(current_user.id), force_reparse=reparse)
+    except service.UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except cv_jobs.CVQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(round(settings.CV_JOB_POLL_INTERVAL))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process CV: {e}")
+    response.headers["Location"] = f"{settings.API_V1_STR}/interviews/cv/jobs/{job['id']}"
+    return _job_response(job)
+
+@router.get("/cv/jobs/{job_id}", response_model=CVJobResponse)
+async def get_cv_job(job_id: str, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    try:
+        job = await cv_jobs.get_cv_job(db, job_id, str(current_user.id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get CV job: {e}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="CV job not found")
+    return _job_response(job)
 
 @router.post("/simulation/start", response_model=InterviewResponse)
-async def start_simulation(request: InterviewStartRequest, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: dict = Depends(get_current_user)):
+async def start_simulation(request: InterviewStartRequest, response: Response, idempotency_key: str | None = Header(None, max_length=255), db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    async def start():
+        interview_id, conversation, agent_response = await service.start_interview_simulation(db, request.cv_id, request.initial_prompt, str(current_user.id))
+        return InterviewResponse(interview_id=interview_id, conversation=conversation, agent_response=agent_response, version=1)
+
     try:
-        interview_id, conversation, agent_response = await service.start_interview_simulation(db, request.cv_id, request.initial_prompt, str(current_user["id"]))
-        return InterviewResponse(interview_id=interview_id, conversation=conversation, agent_response=agent_response)
+        return await _interview_turn(response, str(current_user.id), "start", idempotency_key, fingerprint(request.model_dump_json()), start)
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except AdmissionRejectedError as e:
+        raise _rate_limited(e)
+    except CircuitOpenError as e:
+        raise _model_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start simulation: {e}")
 
-@router.post("/simulation/{interview_id}/continue", response_model=InterviewResponse)
-async def continue_simulation(interview_id: str, message: InterviewMessage, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: dict = Depends(get_current_user)):
+@router.get("/", response_model=InterviewListResponse)
+async def list_interviews(limit: int = Query(20, ge=1, le=100), cursor: str | None = None, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    try:
+        items, next_cursor = await service.list_interviews(db, str(current_user.id), limit, cursor)
+        return InterviewListResponse(items=items, next_cursor=next_cursor)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list interviews: {e}")
+
+@router.post("/simulation/{interview_id}/continue", response_model=InterviewResponse | InterviewDeltaResponse)
+async def continue_simulation(interview_id: str, message: InterviewMessage, response: Response, delta: bool = False, idempotency_key: str | None = Header(None, max_length=255), db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    async def turn():
+        conversation, agent_response, version = await service.continue_interview_simulation(db, interview_id, message.content, delta=delta)
+        if delta:
+            return InterviewDeltaResponse(interview_id=interview_id, version=version, messages=conversation, agent_response=agent_response)
+        return InterviewResponse(interview_id=interview_id, conversation=conversation, agent_response=agent_response, version=version)
+
     try:
-        conversation, agent_response = await service.continue_interview_simulation(db, interview_id, message.content)
-        return InterviewResponse(interview_id=interview_id, conversation=conversation, agent_response=agent_response)
+        return await _interview_turn(response, str(current_user.id), f"continue:{interview_id}", idempotency_key,
+                                     fingerprint(message.model_dump_json(), str(delta)), turn)
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (service.InterviewConflictError, service.InterviewEndedError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AdmissionRejectedError as e:
+        raise _rate_limited(e)
+    except CircuitOpenError as e:
+        raise _model_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to continue simulation: {e}")
+
+@router.post("/simulation/{interview_id}/end", response_model=InterviewEndResponse)
+async def end_simulation(interview_id: str, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    try:
+        update = await service.end_interview(db, interview_id, str(current_user.id))
+        return InterviewEndResponse(interview_id=interview_id, end_time=update["end_time"], turn_count=update["version"],
+                                    raw_bytes=update["archive_raw_bytes"], compressed_bytes=update["archive_compressed_bytes"])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (service.InterviewConflictError, service.InterviewEndedError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to end simulation: {e}")
+
+@router.get("/{interview_id}", response_model=InterviewDetail)
+async def get_interview(interview_id: str, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    try:
+        interview = await service.get_interview(db, interview_id, str(current_user.id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get interview: {e}")
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return InterviewDetail(interview_id=str(interview["_id"]), **{k: v for k, v in interview.items() if k in InterviewDetail.model_fields})
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _event_stream(events):
+    """Open the service stream eagerly so lookup errors still map to HTTP status codes"""
+    first = await anext(events)
+
+    async def body():
+        async with aclosing(events):
+            yield _sse(*first)
+            try:
+                async for event, data in events:
+                    yield _sse(event, data)
+            except Exception as e:
+                # Headers are already sent: report the failure in-band
+                logger.exception("Interview stream failed")
+                yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def _with_model_slot(user: str, events):
+    """The slot is held until the stream ends or the client goes away"""
+    async with model_admission.model_slot(user):
+        async with aclosing(events):
+            async for event in events:
+                yield event
+
+@router.post("/simulation/start/stream")
+async def start_simulation_stream(request: InterviewStartRequest, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(admitted("interview"))):
+    try:
+        events = service.stream_interview_start(db, request.cv_id, request.initial_prompt, str(current_user.id))
+        return await _event_stream(_with_model_slot(str(current_user.id), events))
+    except AdmissionRejectedError as e:
+        raise _rate_limited(e)
+    except CircuitOpenError as e:
+        raise _model_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start simulation: {e}")
+
+@router.post("/simulation/{interview_id}/continue/stream")
+async def continue_simulation_stream(interview_id: str, message: InterviewMessage, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(admitted("interview"))):
+    try:
+        events = service.stream_interview_turn(db, interview_id, message.content)
+        return await _event_stream(_with_model_slot(str(current_user.id), events))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except service.InterviewEndedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AdmissionRejectedError as e:
+        raise _rate_limited(e)
+    except CircuitOpenError as e:
+        raise _model_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to continue simulation: {e}")
 
 @router.post("/feedback", status_code=201)
-async def submit_feedback(request: FeedbackRequest, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: dict = Depends(get_current_user)):
+async def submit_feedback(request: FeedbackRequest, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
     try:
-        feedback_id = await service.submit_feedback(db, request.interview_id, request.feedback_content, str(current_user["id"]))
+        feedback_id = await service.submit_feedback(db, request.interview_id, request.feedback_content, str(current_user.id))
         return {"message": "Feedback submitted successfully", "feedback_id": feedback_id}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit feedback: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to submit feedback: {e}")
+
+def _decode_item(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+async def _feedback_items(request: Request):
+    """Decode a feedback batch without buffering more than the byte cap.
+
+    `application/x-ndjson` bodies are decoded line by line as chunks arrive;
+    other bodies must be a JSON array (or `{"items": [...]}`).
+    """
+    max_bytes = settings.FEEDBACK_BATCH_MAX_BYTES
+    too_large = service.FeedbackBatchTooLargeError(f"A batch holds at most {max_bytes} bytes")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+
+    received = 0
+    buffer = b""
+    parts = []
+    streaming = "ndjson" in request.headers.get("content-type", "")
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise too_large
+        if not streaming:
+            parts.append(chunk)
+            continue
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_item(line)
+
+    if streaming:
+        if buffer.strip():
+            yield _decode_item(buffer)
+        return
+
+    payload = json.loads(b"".join(parts) or b"null")
+    items = payload.get("items") if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of feedback items")
+    for item in items:
+        yield item
+
+@router.post("/feedback/batch", response_model=FeedbackBatchResponse)
+async def submit_feedback_batch(request: Request, db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    try:
+        results = await service.submit_feedback_batch(db, _feedback_items(request), str(current_user.id))
+    except service.FeedbackBatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to submit feedback batch: {e}")
+    created = sum(1 for result in results if result.status == "created")
+    return FeedbackBatchResponse(created=created, failed=len(results) - created, results=results)
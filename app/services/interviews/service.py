@@ -1,60 +1,300 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
 from datetime import datetime
+from weakref import WeakValueDictionary
+from bson import ObjectId
+from typing import AsyncIterator
 from fastapi import UploadFile
+from pydantic import ValidationError
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.clients import cv_agent_api
+from app.config import settings
+from app.core.admission import model_admission
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
+from app.core.singleflight import SingleFlight
+from app.models.mongo.base import object_id
 from app.models.mongo.cv_model import CVModel
 from app.models.mongo.interview_history_model import InterviewHistoryModel
 from app.models.mongo.feedback_model import FeedbackModel
-from app.schemas.interview_schemas import InterviewMessage
+from app.schemas.interview_schemas import FeedbackBatchItemResult, FeedbackRequest, InterviewMessage, InterviewSummary
+from app.services.interviews import archive, pdf_text
+from app.services.interviews.context import PromptContext, build_context
+
+class UploadTooLargeError(Exception):
+    """The uploaded file exceeds CV_MAX_UPLOAD_BYTES"""
+
+class FeedbackBatchTooLargeError(Exception):
+    """The feedback batch exceeds FEEDBACK_BATCH_MAX_ITEMS or FEEDBACK_BATCH_MAX_BYTES"""
+
+class InterviewConflictError(Exception):
+    """Another turn was appended to the interview while this one was in progress"""
+
+class InterviewEndedError(Exception):
+    """The interview has ended and no longer accepts turns"""
+
+# Serializes turns of the same interview within this worker; across workers
+# the `version` field detects concurrent writes.
+_interview_locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+
+def _interview_lock(interview_id: str) -> asyncio.Lock:
+    lock = _interview_locks.get(interview_id)
+    if lock is None:
+        lock = _interview_locks[interview_id] = asyncio.Lock()
+    return lock
+
+# content hash -> (parsed_data, raw_text), in front of the indexed lookup on the CV collection
+_parsed_cv_cache = TTLCache(maxsize=settings.CV_PARSE_CACHE_SIZE, ttl=settings.CV_PARSE_CACHE_TTL_SECONDS)
+cv_parse_lookups = Counter("cv_parse_cache_lookups_total", "CV parse dedup lookups", ("result",))
+
+# Double clicks and client retries send the same CV or prompt concurrently:
+# identical in-flight model calls share one upstream request.
+_model_calls = SingleFlight()
+
+def _simulate(prompt: str):
+    prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+    return _model_calls.do("simulate_interview", prompt_hash, lambda: cv_agent_api.simulate_interview(prompt))
+
+async def _find_parsed_cv(db: AsyncIOMotorDatabase, content_hash: str) -> tuple[dict, str | None] | None:
+    """(parsed_data, raw_text) of a CV already parsed with the same content"""
+    found = _parsed_cv_cache.get(content_hash)
+    if found is not None:
+        cv_parse_lookups.inc(result="memory_hit")
+        return found
+    existing = await CVModel.get(db, CVModel.collection_name, {"content_hash": content_hash}, {"parsed_data": 1, "raw_text": 1})
+    if existing and existing.get("parsed_data"):
+        cv_parse_lookups.inc(result="db_hit")
+        found = (existing["parsed_data"], existing.get("raw_text"))
+        _parsed_cv_cache.set(content_hash, found)
+        return found
+    cv_parse_lookups.inc(result="miss")
+    return None
+
+async def _hash_upload(cv_file: UploadFile) -> str:
+    # Reads the spooled upload chunk by chunk: the hash is computed and the
+    # size limit enforced without ever holding the whole file in memory.
+    if cv_file.size is not None and cv_file.size > settings.CV_MAX_UPLOAD_BYTES:
+        raise UploadTooLargeError(f"CV exceeds {settings.CV_MAX_UPLOAD_BYTES} bytes")
+    digest = hashlib.sha256()
+    size = 0
+    await cv_file.seek(0)
+    while chunk := await cv_file.read(settings.CV_UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.CV_MAX_UPLOAD_BYTES:
+            raise UploadTooLargeError(f"CV exceeds {settings.CV_MAX_UPLOAD_BYTES} bytes")
+        digest.update(chunk)
+    await cv_file.seek(0)
+    return digest.hexdigest()
+
+async def _parse_and_cache(cv_file: UploadFile, content_hash: str, raw_text: str | None) -> dict:
+    # Parses hold a model call slot only for the call itself, and share the
+    # slots with interview turns as one more user in the rotation
+    async with model_admission.model_slot("cv_jobs", wait=True):
+        if settings.CV_SEND_TEXT_TO_MODEL and raw_text:
+            parsed_data = await cv_agent_api.parse_cv_text(raw_text, cv_file.filename)
+        else:
+            parsed_data = await cv_agent_api.parse_cv(cv_file)
+    _parsed_cv_cache.set(content_hash, (parsed_data, raw_text))
+    return parsed_data
+
+async def process_cv_upload(db: AsyncIOMotorDatabase, cv_file: UploadFile, user_id: str, force_reparse: bool = False,
+                            content_hash: str | None = None):
+    if content_hash is None:
+        content_hash = await _hash_upload(cv_file)
+
+    # A CV already parsed reuses its stored text: no extraction and no model call
+    found = None if force_reparse else await _find_parsed_cv(db, content_hash)
+    if found is not None:
+        parsed_data, raw_text = found
+    else:
+        # CPU-bound, runs in the extraction process pool
+        raw_text = await pdf_text.extract_text(cv_file)
+        parsed_data = await _model_calls.do("parse_cv", content_hash, lambda: _parse_and_cache(cv_file, content_hash, raw_text))
 
-async def process_cv_upload(db: AsyncIOMotorDatabase, cv_file: UploadFile, user_id: str):
-    parsed_data = await cv_agent_api.parse_cv(cv_file)
     cv_entry = CVModel(
         user_id=user_id,
         parsed_data=parsed_data,
-        raw_text=None, # You might want to extract text from PDF here
-        upload_date=datetime.utcnow().isoformat()
+        raw_text=raw_text,
+        upload_date=datetime.utcnow().isoformat(),
+        content_hash=content_hash
     )
     cv_id = await CVModel.create(db, CVModel.collection_name, cv_entry.model_dump(exclude_unset=True))
     return cv_id, parsed_data
 
-async def start_interview_simulation(db: AsyncIOMotorDatabase, cv_id: str, initial_prompt: str, user_id: str):
-    # Initial call to agent
-    agent_response = await cv_agent_api.simulate_interview(initial_prompt)
-
+def _new_interview(cv_id: str, initial_prompt: str, agent_text: str, user_id: str) -> tuple[dict, list[dict]]:
     conversation = [
         InterviewMessage(role="user", content=initial_prompt).model_dump(),
-        InterviewMessage(role="agent", content=agent_response.get("response")).model_dump()
+        InterviewMessage(role="agent", content=agent_text).model_dump()
     ]
 
+    now = datetime.utcnow().isoformat()
     interview_entry = InterviewHistoryModel(
         user_id=user_id,
         cv_id=cv_id,
         conversation=conversation,
-        start_time=datetime.utcnow().isoformat()
+        start_time=now,
+        last_activity_at=now,
+        version=1
     )
-    interview_id = await InterviewHistoryModel.create(db, InterviewHistoryModel.collection_name, interview_entry.model_dump(exclude_unset=True))
+    return interview_entry.model_dump(exclude_unset=True), conversation
+
+async def start_interview_simulation(db: AsyncIOMotorDatabase, cv_id: str, initial_prompt: str, user_id: str):
+    # Initial call to agent
+    agent_response = await _simulate(initial_prompt)
+
+    interview_data, conversation = _new_interview(cv_id, initial_prompt, agent_response.get("response"), user_id)
+    interview_id = await InterviewHistoryModel.create(db, InterviewHistoryModel.collection_name, interview_data)
     return interview_id, conversation, agent_response.get("response")
 
-async def continue_interview_simulation(db: AsyncIOMotorDatabase, interview_id: str, user_message: str):
-    interview_history = await InterviewHistoryModel.get(db, InterviewHistoryModel.collection_name, {"_id": interview_id})
+@dataclass
+class _PendingTurn:
+    interview_id: str
+    version: int
+    version_guard: dict
+    user_entry: dict
+    context: PromptContext
+
+async def _prepare_turn(db: AsyncIOMotorDatabase, interview_id: str, user_message: str) -> _PendingTurn:
+    # Only the tail needed for the context window is read; older turns are
+    # represented by the cached rolling summary.
+    tail_size = settings.INTERVIEW_CONTEXT_MAX_TURNS * 2 + 2
+    interview_history = await InterviewHistoryModel.get(db, InterviewHistoryModel.collection_name,
+                                                        {"_id": object_id(interview_id)},
+                                                        {"conversation": {"$slice": -tail_size}, "version": 1, "summary": 1,
+                                                         "summarized_count": 1, "summarized_chars": 1, "end_time": 1})
     if not interview_history:
         raise ValueError("Interview not found")
+    if interview_history.get("end_time"):
+        raise InterviewEndedError("Interview has ended")
+
+    tail = interview_history.get("conversation", [])
+    if "version" in interview_history:
+        version = interview_history["version"]
+        version_guard = {"version": version}
+        first_index = version * 2 - len(tail)
+    else:
+        # Documents created before versioning have no `version` field yet and
+        # the sliced tail says nothing about their length: read the whole
+        # conversation once, the guarded update then stores its version and
+        # the older turns get folded into the summary.
+        legacy = await InterviewHistoryModel.get(db, InterviewHistoryModel.collection_name,
+                                                 {"_id": object_id(interview_id)}, {"conversation": 1})
+        tail = (legacy or {}).get("conversation", [])
+        version = len(tail) // 2
+        version_guard = {"version": {"$exists": False}}
+        first_index = 0
+
+    user_entry = InterviewMessage(role="user", content=user_message).model_dump()
+    context = build_context(tail + [user_entry], first_index=first_index,
+                            summary=interview_history.get("summary"),
+                            summarized_count=interview_history.get("summarized_count", 0),
+                            summarized_chars=interview_history.get("summarized_chars", 0))
+    return _PendingTurn(interview_id, version, version_guard, user_entry, context)
+
+async def _append_turn(db: AsyncIOMotorDatabase, turn: _PendingTurn, agent_text: str, delta: bool = False) -> dict:
+    agent_entry = InterviewMessage(role="agent", content=agent_text).model_dump()
+
+    # Only the new turn goes over the wire; the version guard rejects the
+    # write if another worker appended a turn since we read the document.
+    updated = await InterviewHistoryModel.push(db, InterviewHistoryModel.collection_name,
+                                               {"_id": object_id(turn.interview_id), **turn.version_guard},
+                                               {"conversation": [turn.user_entry, agent_entry]},
+                                               set_data={"version": turn.version + 1, "summary": turn.context.summary,
+                                                         "last_activity_at": datetime.utcnow().isoformat(),
+                                                         "summarized_count": turn.context.summarized_count,
+                                                         "summarized_chars": turn.context.summarized_chars},
+                                               projection={"conversation": {"$slice": -2}, "version": 1} if delta else None)
+    if updated is None:
+        raise InterviewConflictError("Interview was updated concurrently, please retry")
+    return updated
+
+async def continue_interview_simulation(db: AsyncIOMotorDatabase, interview_id: str, user_message: str, delta: bool = False):
+    """Run one turn; with `delta` only the appended messages are read back instead of the whole conversation"""
+    async with _interview_lock(interview_id):
+        turn = await _prepare_turn(db, interview_id, user_message)
+        agent_response = await _simulate(turn.context.prompt)
+        updated = await _append_turn(db, turn, agent_response.get("response"), delta=delta)
+
+    return updated["conversation"], agent_response.get("response"), updated["version"]
+
+async def end_interview(db: AsyncIOMotorDatabase, interview_id: str, user_id: str) -> dict:
+    """Set end_time and move the conversation of `user_id`'s interview to the compressed archive"""
+    async with _interview_lock(interview_id):
+        interview = await InterviewHistoryModel.get(db, InterviewHistoryModel.collection_name,
+                                                    {"_id": object_id(interview_id), "user_id": user_id})
+        if not interview:
+            raise ValueError("Interview not found")
+        if interview.get("archived"):
+            raise InterviewEndedError("Interview has already ended")
+        update = await archive.archive_interview(db, interview, reason="ended", end_time=datetime.utcnow().isoformat(),
+                                                 user_id=user_id)
+    if update is None:
+        raise InterviewConflictError("Interview was updated concurrently, please retry")
+    return update
+
+async def get_interview(db: AsyncIOMotorDatabase, interview_id: str, user_id: str) -> dict | None:
+    """Full interview of `user_id`; archived conversations are decompressed on the fly"""
+    interview = await InterviewHistoryModel.get(db, InterviewHistoryModel.collection_name,
+                                                {"_id": object_id(interview_id), "user_id": user_id})
+    if interview:
+        interview["conversation"] = await archive.load_conversation(db, interview)
+    return interview
+
+async def list_interviews(db: AsyncIOMotorDatabase, user_id: str, limit: int, cursor: str | None = None):
+    docs, next_cursor = await InterviewHistoryModel.page(db, InterviewHistoryModel.collection_name, {"user_id": user_id},
+                                                         {"cv_id": 1, "start_time": 1, "end_time": 1, "version": 1},
+                                                         limit=limit, after=cursor)
+    # Documents created before versioning have no `version`: their turn count
+    # comes from the server-side length of the conversation, as in archive.py
+    legacy_ids = [doc["_id"] for doc in docs if "version" not in doc]
+    legacy_turns = {}
+    if legacy_ids:
+        pipeline = [{"$match": {"_id": {"$in": legacy_ids}}},
+                    {"$project": {"messages": {"$size": {"$ifNull": ["$conversation", []]}}}}]
+        async for row in db[InterviewHistoryModel.collection_name].aggregate(pipeline):
+            legacy_turns[row["_id"]] = row["messages"] // 2
+    items = [
+        InterviewSummary(interview_id=str(doc["_id"]), cv_id=doc.get("cv_id"), start_time=doc.get("start_time"),
+                         end_time=doc.get("end_time"), turn_count=doc.get("version", legacy_turns.get(doc["_id"], 0)))
+        for doc in docs
+    ]
+    return items, next_cursor
+
+async def stream_interview_start(db: AsyncIOMotorDatabase, cv_id: str, initial_prompt: str, user_id: str):
+    """Stream the first agent answer, then persist the new interview.
+
+    Yields `(event, data)` pairs: `start` with the pre-allocated interview id,
+    one `token` per model chunk and `done` once the interview is stored.
+    Nothing is written if the stream is interrupted.
+    """
+    cv_agent_api.check_available()
+    interview_id = ObjectId()
+    yield "start", {"interview_id": str(interview_id)}
 
-    current_conversation = interview_history.get("conversation", [])
-    current_conversation.append(InterviewMessage(role="user", content=user_message).model_dump())
+    chunks = []
+    async for chunk in cv_agent_api.stream_interview(initial_prompt):
+        chunks.append(chunk)
+        yield "token", {"content": chunk}
 
-    # Send full conversation to agent for context
-    full_prompt = "\n".join([msg["content"] for msg in current_conversation])
-    agent_response = await cv_agent_api.simulate_interview(full_prompt)
+    interview_data, _ = _new_interview(cv_id, initial_prompt, "".join(chunks), user_id)
+    await InterviewHistoryModel.create(db, InterviewHistoryModel.collection_name, {"_id": interview_id, **interview_data})
+    yield "done", {"interview_id": str(interview_id), "version": 1}
 
-    current_conversation.append(InterviewMessage(role="agent", content=agent_response.get("response")).model_dump())
+async def stream_interview_turn(db: AsyncIOMotorDatabase, interview_id: str, user_message: str):
+    """Streaming counterpart of continue_interview_simulation, same events as stream_interview_start"""
+    cv_agent_api.check_available()
+    async with _interview_lock(interview_id):
+        turn = await _prepare_turn(db, interview_id, user_message)
+        yield "start", {"interview_id": interview_id, "version": turn.version}
 
-    await InterviewHistoryModel.update(db, InterviewHistoryModel.collection_name, 
-                                       {"_id": interview_id}, 
-                                       {"conversation": current_conversation})
-    
-    return current_conversation, agent_response.get("response")
+        chunks = []
+        async for chunk in cv_agent_api.stream_interview(turn.context.prompt):
+            chunks.append(chunk)
+            yield "token", {"content": chunk}
+
+        updated = await _append_turn(db, turn, "".join(chunks))
+    yield "done", {"interview_id": interview_id, "version": updated["version"]}
 
 async def submit_feedback(db: AsyncIOMotorDatabase, interview_id: str, feedback_content: dict, user_id: str):
     feedback_entry = FeedbackModel(
@@ -65,3 +305,45 @@ async def submit_feedback(db: AsyncIOMotorDatabase, interview_id: str, feedback_
     )
     feedback_id = await FeedbackModel.create(db, FeedbackModel.collection_name, feedback_entry.model_dump(exclude_unset=True))
     return feedback_id
+
+def _validation_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}" for detail in error.errors())
+    return str(error)
+
+async def submit_feedback_batch(db: AsyncIOMotorDatabase, items: AsyncIterator[dict | Exception], user_id: str) -> list[FeedbackBatchItemResult]:
+    """Validate a stream of feedback items, then insert the valid ones with unordered bulk writes.
+
+    `items` yields decoded items, or the decoding error for malformed ones.
+    Nothing is written if the batch turns out to exceed FEEDBACK_BATCH_MAX_ITEMS.
+    """
+    results: list[FeedbackBatchItemResult] = []
+    documents: list[tuple[int, dict]] = []
+    feedback_date = datetime.utcnow().isoformat()
+
+    index = 0
+    async for item in items:
+        if index >= settings.FEEDBACK_BATCH_MAX_ITEMS:
+            raise FeedbackBatchTooLargeError(f"A batch holds at most {settings.FEEDBACK_BATCH_MAX_ITEMS} items")
+        try:
+            if isinstance(item, Exception):
+                raise item
+            request = FeedbackRequest.model_validate(item)
+            feedback_entry = FeedbackModel(user_id=user_id, interview_id=request.interview_id,
+                                           feedback_content=request.feedback_content, feedback_date=feedback_date)
+            documents.append((index, feedback_entry.model_dump(exclude_unset=True)))
+        except ValueError as e:
+            results.append(FeedbackBatchItemResult(index=index, status="error", error=_validation_message(e)))
+        index += 1
+
+    for start in range(0, len(documents), settings.FEEDBACK_BATCH_WRITE_SIZE):
+        chunk = documents[start:start + settings.FEEDBACK_BATCH_WRITE_SIZE]
+        errors = await FeedbackModel.create_many(db, FeedbackModel.collection_name, [document for _, document in chunk])
+        for position, (item_index, document) in enumerate(chunk):
+            if position in errors:
+                results.append(FeedbackBatchItemResult(index=item_index, status="error", error=errors[position]))
+            else:
+                results.append(FeedbackBatchItemResult(index=item_index, status="created", feedback_id=str(document["_id"])))
+
+    results.sort(key=lambda result: result.index)
+    return results
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter as TermCounter
+from dataclasses import dataclass
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from scipy import sparse
+from app.core.metrics import Counter, Histogram
+from app.models.mongo.base import object_id
+from app.models.mongo.cv_model import CVModel
+from app.services.jobs.service import JobOfferSnapshot, job_offer_cache
+
+logger = logging.getLogger(__name__)
+
+matching_rebuild_duration = Histogram("job_matching_rebuild_duration_seconds", "Time to rebuild the job matching index")
+matching_query_duration = Histogram("job_matching_query_duration_seconds", "Time to score all offers for one CV",
+                                    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25))
+matching_vectorized_offers = Counter("job_matching_vectorized_offers_total", "Offers tokenized by index rebuilds", ("source",))
+
+# Keeps tokens such as c++, c#, node.js or .net
+TOKEN_RE = re.compile(r"[a-z0-9.#+]*[a-z0-9#+]")
+STOP_WORDS = frozenset("""a an and are as at be by de des du en et for from in is la le les of on or our the to un une we with you your""".split())
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+def _strings(value):
+    # parsed_data and offers are free-form: walk every nested string and number
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield str(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+def document_terms(document) -> TermCounter:
+    return TermCounter(token for text in _strings(document) for token in tokenize(text))
+
+def _offer_key(offer: dict) -> str:
+    # Content hash: an offer edited upstream is vectorized again
+    return hashlib.blake2b(json.dumps(offer, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+@dataclass(frozen=True)
+class MatchingIndex:
+    """TF-IDF index over one offer snapshot, immutable once built"""
+    etag: str
+    offers: list[dict]
+    vocabulary: dict[str, int]
+    idf: np.ndarray
+    matrix: sparse.csc_matrix # offers x terms, L2-normalized rows; CSC so a query only reads its own terms' columns
+    fetched_at: str
+
+    def top_k(self, terms: TermCounter, k: int) -> list[tuple[int, float]]:
+        pairs = [(self.vocabulary[term], count) for term, count in terms.items()
+                 if term in self.vocabulary and self.vocabulary[term] < len(self.idf)]
+        if not pairs or not self.offers:
+            return []
+        ids = np.fromiter((term_id for term_id, _ in pairs), dtype=np.int64, count=len(pairs))
+        counts = np.fromiter((count for _, count in pairs), dtype=np.float64, count=len(pairs))
+        weights = (1 + np.log(counts)) * self.idf[ids]
+        norm = np.linalg.norm(weights)
+        if not norm:
+            return []
+        # Cosine similarity with every offer in one sparse mat-vec
+        scores = self.matrix[:, ids] @ (weights / norm)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(i), float(scores[i])) for i in best if scores[i] > 0]
+
+class JobMatcher:
+    """Keeps a MatchingIndex in sync with the job offer snapshot.
+
+    Rebuilds are incremental: term counts are cached per offer (keyed by
+    content hash), so only new or edited offers are tokenized again; the IDF
+    weights and the sparse matrix are then recomputed with vectorized NumPy
+    operations. Each rebuild keeps only the terms of the live offers, so the
+    vocabulary does not grow with a changing feed. Queries keep using the
+    previous index while a rebuild runs in a worker thread.
+    """
+
+    def __init__(self):
+        self.vocabulary: dict[str, int] = {}
+        self._offer_terms: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._index: MatchingIndex | None = None
+        self._rebuild_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _vectorize(offer: dict, vocabulary: dict[str, int]) -> tuple[np.ndarray, np.ndarray]:
+        terms = document_terms(offer)
+        ids = np.fromiter((vocabulary.setdefault(term, len(vocabulary)) for term in terms), dtype=np.int32, count=len(terms))
+        counts = np.fromiter(terms.values(), dtype=np.float32, count=len(terms))
+        return ids, counts
+
+    def build(self, offers: list[dict], etag: str = "", fetched_at: str = "") -> MatchingIndex:
+        start = time.perf_counter()
+        # Working copy: the published index keeps its own vocabulary untouched
+        vocabulary = dict(self.vocabulary)
+        offer_terms = {}
+        keys = []
+        rows = []
+        tokenized = 0
+        for offer in offers:
+            key = _offer_key(offer)
+            vector = offer_terms.get(key) or self._offer_terms.get(key)
+            if vector is None:
+                vector = self._vectorize(offer, vocabulary)
+                tokenized += 1
+            offer_terms[key] = vector
+            keys.append(key)
+            rows.append(vector)
+        matching_vectorized_offers.inc(tokenized, source="tokenized")
+        matching_vectorized_offers.inc(len(rows) - tokenized, source="reused")
+
+        n_offers = len(rows)
+        lengths = np.fromiter((len(ids) for ids, _ in rows), dtype=np.int64, count=n_offers)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.concatenate([ids for ids, _ in rows]) if rows else np.empty(0, dtype=np.int32)
+        counts = np.concatenate([counts for _, counts in rows]) if rows else np.empty(0, dtype=np.float32)
+
+        # Terms only found in offers gone from the feed are dropped, the others
+        # renumbered in order; cached offer vectors are remapped to the new ids
+        document_frequency = np.bincount(indices, minlength=len(vocabulary))
+        live = np.flatnonzero(document_frequency)
+        if len(live) < len(vocabulary):
+            remap = np.full(len(vocabulary), -1, dtype=np.int32)
+            remap[live] = np.arange(len(live), dtype=np.int32)
+            indices = remap[indices]
+            terms = np.array(list(vocabulary), dtype=object)
+            vocabulary = dict(zip(terms[live].tolist(), range(len(live))))
+            document_frequency = document_frequency[live]
+            for key, ids, (_, row_counts) in zip(keys, np.split(indices, indptr[1:-1]), rows):
+                offer_terms[key] = (ids, row_counts)
+        # Offers gone from the feed are forgotten
+        self._offer_terms = offer_terms
+        self.vocabulary = vocabulary
+        n_terms = len(vocabulary)
+
+        # Smoothed IDF, sublinear TF, L2-normalized rows
+        idf = np.log((1 + n_offers) / (1 + document_frequency)) + 1
+        weights = (1 + np.log(counts)) * idf[indices]
+        row_ids = np.repeat(np.arange(n_offers), lengths)
+        norms = np.sqrt(np.bincount(row_ids, weights=weights ** 2, minlength=n_offers))
+        weights /= np.where(norms > 0, norms, 1)[row_ids]
+
+        matrix = sparse.csr_matrix((weights, indices, indptr), shape=(n_offers, n_terms)).tocsc()
+        matching_rebuild_duration.observe(time.perf_counter() - start)
+        return MatchingIndex(etag=etag, offers=offers, vocabulary=vocabulary, idf=idf, matrix=matrix, fetched_at=fetched_at)
+
+    async def index(self) -> MatchingIndex:
+        snapshot = await job_offer_cache.get()
+        if self._index is None or self._index.etag != snapshot.etag:
+            task = self._start_rebuild(snapshot)
+            if self._index is None:
+                await asyncio.shield(task)
+        return self._index
+
+    def _start_rebuild(self, snapshot: JobOfferSnapshot) -> asyncio.Task:
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild(snapshot))
+        return self._rebuild_task
+
+    async def _rebuild(self, snapshot: JobOfferSnapshot):
+        try:
+            self._index = await asyncio.to_thread(self.build, snapshot.offers, snapshot.etag, snapshot.fetched_at)
+        except Exception:
+            logger.exception("Job matching index rebuild failed")
+            if self._index is None:
+                raise
+
+    async def match(self, document, k: int) -> tuple[MatchingIndex, list[tuple[dict, float]]]:
+        index = await self.index()
+        terms = document_terms(document)
+        with matching_query_duration.time():
+            best = index.top_k(terms, k)
+        return index, [(index.offers[i], score) for i, score in best]
+
+job_matcher = JobMatcher()
+
+async def match_cv(db: AsyncIOMotorDatabase, cv_id: str, user_id: str, k: int) -> tuple[MatchingIndex, list[tuple[dict, float]]]:
+    cv = await CVModel.get(db, CVModel.collection_name, {"_id": object_id(cv_id), "user_id": user_id}, {"parsed_data": 1})
+    if not cv:
+        raise ValueError("CV not found")
+    return await job_matcher.match(cv.get("parsed_data") or {}, k)
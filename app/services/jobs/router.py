@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.database import mongo_db
+from app.schemas.job_schemas import JobMatch, JobMatchResponse, JobOfferPage
+from app.services.auth.security import Principal, get_current_user
+from app.services.jobs import matching, service
+
+router = APIRouter()
+
+async def get_mongo_db():
+    return mongo_db
+
+@router.get("/", response_model=JobOfferPage)
+async def list_job_offers(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    q: str | None = None,
+    company: str | None = None,
+    location: str | None = None,
+    if_none_match: str | None = Header(None),
+):
+    try:
+        snapshot, items, total = await service.list_job_offers(limit, offset, q, company, location)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to fetch job offers: {e}")
+
+    etag = service.page_etag(snapshot, limit, offset, q, company, location)
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return JobOfferPage(items=items, total=total, limit=limit, offset=offset, fetched_at=snapshot.fetched_at)
+
+@router.get("/match/{cv_id}", response_model=JobMatchResponse)
+async def match_job_offers(cv_id: str, k: int = Query(10, ge=1, le=100), db: AsyncIOMotorDatabase = Depends(get_mongo_db), current_user: Principal = Depends(get_current_user)):
+    try:
+        index, matches = await matching.match_cv(db, cv_id, str(current_user.id), k)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to match job offers: {e}")
+    return JobMatchResponse(cv_id=cv_id, items=[JobMatch(score=round(score, 4), offer=offer) for offer, score in matches],
+                            fetched_at=index.fetched_at)
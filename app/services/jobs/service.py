@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from app.clients import job_offer_api
+from app.config import settings
+from app.core.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+job_offer_refreshes = Counter("job_offer_refreshes_total", "Job offer feed refreshes", ("outcome",))
+
+@dataclass
+class JobOfferSnapshot:
+    offers: list[dict]
+    etag: str
+    fetched_at: str # ISO format string
+    loaded_at: float = field(default_factory=time.monotonic)
+    search_text: list[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, offers: list[dict]) -> "JobOfferSnapshot":
+        payload = json.dumps(offers, sort_keys=True, default=str).encode()
+        return cls(
+            offers=offers,
+            etag=hashlib.sha256(payload).hexdigest()[:32],
+            fetched_at=datetime.utcnow().isoformat(),
+            search_text=[_searchable(offer) for offer in offers],
+        )
+
+def _searchable(offer: dict) -> str:
+    return " ".join(str(value) for value in offer.values() if isinstance(value, (str, int, float))).lower()
+
+def _normalize(payload) -> list[dict]:
+    # The feed is either a bare list or wrapped in an envelope
+    if isinstance(payload, dict):
+        for key in ("offers", "results", "data", "items"):
+            if isinstance(payload.get(key), list):
+                payload = payload[key]
+                break
+        else:
+            payload = []
+    return [offer for offer in payload if isinstance(offer, dict)]
+
+class JobOfferCache:
+    """Stale-while-revalidate cache over the job offer feed.
+
+    Fresh snapshots are served directly; once older than the TTL the stale
+    snapshot is still served while a single background refresh runs. If the
+    upstream fails, the last good snapshot keeps being served.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshot: JobOfferSnapshot | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self.last_error: str | None = None
+
+    async def get(self) -> JobOfferSnapshot:
+        if self._snapshot is None:
+            # Nothing to serve yet: wait for the (shared) first fetch
+            await asyncio.shield(self._start_refresh())
+            if self._snapshot is None:
+                raise RuntimeError(f"Job offers unavailable: {self.last_error}")
+        elif time.monotonic() - self._snapshot.loaded_at > self.ttl:
+            self._start_refresh()
+        return self._snapshot
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def _refresh(self):
+        try:
+            offers = _normalize(await job_offer_api.get_job_offers())
+        except Exception as e:
+            job_offer_refreshes.inc(outcome="error")
+            self.last_error = str(e)
+            logger.warning("Job offer refresh failed, serving last snapshot: %s", e)
+            if self._snapshot is not None:
+                # Back off for a full TTL before retrying the upstream
+                self._snapshot.loaded_at = time.monotonic()
+            return
+        job_offer_refreshes.inc(outcome="ok")
+        self.last_error = None
+        if self._snapshot is not None and self._snapshot.offers == offers:
+            self._snapshot.loaded_at = time.monotonic()
+        else:
+            self._snapshot = JobOfferSnapshot.build(offers)
+
+job_offer_cache = JobOfferCache(ttl=settings.JOB_OFFERS_TTL_SECONDS)
+
+def _matches(offer: dict, text: str, q: str | None, company: str | None, location: str | None) -> bool:
+    if q and q not in text:
+        return False
+    if company and company not in str(offer.get("company", "")).lower():
+        return False
+    if location and location not in str(offer.get("location", "")).lower():
+        return False
+    return True
+
+async def list_job_offers(limit: int, offset: int, q: str | None = None, company: str | None = None,
+                          location: str | None = None) -> tuple[JobOfferSnapshot, list[dict], int]:
+    snapshot = await job_offer_cache.get()
+    q, company, location = (value.lower() if value else None for value in (q, company, location))
+    if q or company or location:
+        matching = [offer for offer, text in zip(snapshot.offers, snapshot.search_text)
+                    if _matches(offer, text, q, company, location)]
+    else:
+        matching = snapshot.offers
+    return snapshot, matching[offset:offset + limit], len(matching)
+
+def page_etag(snapshot: JobOfferSnapshot, *params) -> str:
+    key = ":".join([snapshot.etag, *(str(param) for param in params)])
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
@@ -0,0 +1,151 @@
+"""Local stand-ins for the services the API depends on.
+
+- a fake model API (`/parse`, `/parse/text`, `/simulate`, `/simulate/stream`) and job feed
+  (`/jobs`) with configurable latency
+- an SMTP sink counting delivered messages
+- a minimal text PDF writer for synthetic CVs
+- a helper running any ASGI app under uvicorn in a background thread
+"""
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import uvicorn
+from aiosmtpd.controller import Controller
+from fastapi import FastAPI, File, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+class PromptRequest(BaseModel):
+    prompt: str
+
+class TextParseRequest(BaseModel):
+    text: str
+    filename: str | None = None
+
+def create_fake_model_app(latency_ms: float = 50, jitter_ms: float = 10, offers: int = 200) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = {"parse": 0, "parse_text": 0, "simulate": 0, "stream": 0, "jobs": 0}
+
+    async def delay():
+        await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+
+    @app.post("/parse")
+    async def parse(file: UploadFile = File(...)):
+        app.state.calls["parse"] += 1
+        size = len(await file.read())
+        await delay()
+        return {"name": "Jane Doe", "skills": ["python", "fastapi", "mongodb"], "size": size}
+
+    @app.post("/parse/text")
+    async def parse_text(request: TextParseRequest):
+        app.state.calls["parse_text"] += 1
+        await delay()
+        return {"name": "Jane Doe", "skills": ["python", "fastapi", "mongodb"], "size": len(request.text)}
+
+    @app.post("/simulate")
+    async def simulate(request: PromptRequest):
+        app.state.calls["simulate"] += 1
+        await delay()
+        return {"response": f"Interesting. Can you tell me more about that? ({len(request.prompt)} chars of context)"}
+
+    @app.post("/simulate/stream")
+    async def simulate_stream(request: PromptRequest):
+        app.state.calls["stream"] += 1
+
+        async def tokens():
+            await delay()
+            for token in ["Interesting.", " Can", " you", " tell", " me", " more?"]:
+                yield f"data: {json.dumps({'token': token})}\n\n"
+                await asyncio.sleep(0.005)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(tokens(), media_type="text/event-stream")
+
+    @app.get("/jobs")
+    async def jobs():
+        app.state.calls["jobs"] += 1
+        await delay()
+        return [{"id": i, "title": f"Backend developer {i}", "company": f"Company {i % 17}", "location": ["Paris", "Lyon", "Remote"][i % 3],
+                 "description": "Python, FastAPI, MongoDB, PostgreSQL"} for i in range(offers)]
+
+    return app
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """Uncompressed PDF with one Helvetica text line per string"""
+    def escape(line: str) -> str:
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       f"/Contents {5 + 2 * i} 0 R >>".encode())
+        stream = ("BT /F1 10 Tf 13 TL 50 760 Td " + " ".join(f"({escape(line)}) '" for line in lines) + " ET").encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+def synthetic_cv_pdf(seed: int, pages: int = 2, lines_per_page: int = 45) -> bytes:
+    rng = random.Random(seed)
+    words = ["Python", "FastAPI", "MongoDB", "PostgreSQL", "Docker", "Kubernetes", "led", "built", "designed", "team",
+             "platform", "API", "data", "pipeline", "migration", "latency", "customers", "product", "cloud", "AWS"]
+    return make_pdf([[f"Candidate {seed}"] + [" ".join(rng.choices(words, k=12)) for _ in range(lines_per_page)]
+                     for _ in range(pages)])
+
+class SMTPSink:
+    """Accepts every message and only counts it"""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted"
+
+def start_smtp_sink(port: int) -> tuple[Controller, SMTPSink]:
+    sink = SMTPSink()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, sink
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn in a daemon thread"""
+
+    def __init__(self, app, port: int):
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
@@ -0,0 +1,96 @@
+"""Benchmark of the CV-to-job-offer matching index.
+
+Builds the TF-IDF index over synthetic offers, measures an incremental rebuild
+after part of the feed changed, then top-k query latency for synthetic CVs.
+Runs in-process, no services needed.
+
+    python -m benchmarks.matching                      # 100k offers
+    python -m benchmarks.matching --offers 20000 --changed 0.05 --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.run import percentile
+
+SKILLS = ["python", "fastapi", "django", "flask", "sql", "postgresql", "mongodb", "redis", "kafka", "spark", "airflow",
+          "docker", "kubernetes", "terraform", "aws", "gcp", "azure", "react", "vue", "typescript", "node.js", "java",
+          "kotlin", "go", "rust", "c++", "c#", ".net", "pytorch", "tensorflow", "scikit-learn", "pandas", "numpy",
+          "llm", "nlp", "mlops", "graphql", "grpc", "linux", "ci/cd", "git", "tableau", "power-bi", "excel", "figma"]
+TITLES = ["backend engineer", "data engineer", "data scientist", "frontend developer", "fullstack developer",
+          "devops engineer", "ml engineer", "data analyst", "site reliability engineer", "software architect"]
+CITIES = ["paris", "lyon", "marseille", "toulouse", "bordeaux", "lille", "nantes", "remote"]
+WORDS = ["team", "product", "platform", "scale", "customers", "ownership", "growth", "quality", "mission", "impact",
+         "startup", "agile", "innovative", "international", "autonomy", "mentoring", "roadmap", "stack", "users"]
+
+def configure_settings_environment():
+    # app.config needs its settings even though nothing is contacted
+    for name in ("SECRET_KEY", "GMAIL_USER", "GMAIL_PASSWORD", "MONGO_URI", "MONGO_DB_NAME", "MONGO_CV_COLLECTION",
+                 "MONGO_INTERVIEW_COLLECTION", "MONGO_FEEDBACK_COLLECTION", "PG_USER", "MODEL_API_URL", "JOB_API_URL",
+                 "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET"):
+        os.environ.setdefault(name, "benchmark")
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+def synthetic_offer(rng: random.Random, index: int) -> dict:
+    skills = rng.sample(SKILLS, rng.randint(3, 8))
+    return {
+        "id": index,
+        "title": f"{rng.choice(['junior', 'senior', 'lead', ''])} {rng.choice(TITLES)}".strip(),
+        "company": f"company-{rng.randint(1, 5000)}",
+        "location": rng.choice(CITIES),
+        "skills": skills,
+        "description": " ".join(rng.choices(WORDS + skills, k=rng.randint(30, 80))),
+    }
+
+def synthetic_cv(rng: random.Random) -> dict:
+    return {
+        "title": rng.choice(TITLES),
+        "skills": rng.sample(SKILLS, rng.randint(4, 12)),
+        "experience": [{"role": rng.choice(TITLES), "description": " ".join(rng.choices(WORDS + SKILLS, k=40))} for _ in range(3)],
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction of offers replaced before the incremental rebuild")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    configure_settings_environment()
+    from app.services.jobs.matching import JobMatcher, document_terms
+
+    rng = random.Random(args.seed)
+    offers = [synthetic_offer(rng, i) for i in range(args.offers)]
+    matcher = JobMatcher()
+
+    start = time.perf_counter()
+    index = matcher.build(offers, etag="v1")
+    full_build = time.perf_counter() - start
+
+    changed = int(len(offers) * args.changed)
+    updated = offers[changed:] + [synthetic_offer(rng, args.offers + i) for i in range(changed)]
+    start = time.perf_counter()
+    index = matcher.build(updated, etag="v2")
+    incremental_build = time.perf_counter() - start
+
+    cvs = [document_terms(synthetic_cv(rng)) for _ in range(args.queries)]
+    latencies = []
+    for terms in cvs:
+        start = time.perf_counter()
+        index.top_k(terms, args.k)
+        latencies.append(time.perf_counter() - start)
+
+    print(f"offers: {len(updated)}, vocabulary: {len(index.vocabulary)}, non-zeros: {index.matrix.nnz}")
+    print(f"full build: {full_build * 1000:.0f} ms")
+    print(f"incremental build ({changed} offers changed): {incremental_build * 1000:.0f} ms")
+    print(f"top-{args.k} query over {args.queries} CVs: p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.2f} ms, p99 {percentile(latencies, 99) * 1000:.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Benchmark of local PDF text extraction across process pool sizes.
+
+Extracts synthetic CV PDFs with the same worker function and limits as the
+API, for each pool size, and reports documents/pages per second plus the
+upload size saved by sending text instead of the file.
+
+    python -m benchmarks.pdf_extraction                     # 200 documents, 1/2/4 workers
+    python -m benchmarks.pdf_extraction --documents 500 --pages 3 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fakes import synthetic_cv_pdf
+from benchmarks.matching import configure_settings_environment
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    configure_settings_environment()
+    from app.config import settings
+    from app.services.interviews.pdf_text import extract_pdf_text
+
+    documents = [synthetic_cv_pdf(seed, pages=args.pages) for seed in range(args.documents)]
+    limits = (settings.PDF_EXTRACT_MAX_PAGES, settings.PDF_EXTRACT_MAX_CHARS, settings.PDF_EXTRACT_TIMEOUT_SECONDS)
+    pdf_bytes = sum(len(document) for document in documents)
+    print(f"{args.documents} documents, {args.pages} pages each, {pdf_bytes / args.documents / 1024:.1f} KB average, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'docs/s':>10}{'pages/s':>10}{'seconds':>10}")
+
+    text_bytes = 0
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Spawning and importing in the workers is not part of the measurement
+            list(pool.map(extract_pdf_text, documents[:workers], *([limit] * workers for limit in limits)))
+            start = time.perf_counter()
+            results = list(pool.map(extract_pdf_text, documents, *([limit] * len(documents) for limit in limits), chunksize=4))
+            elapsed = time.perf_counter() - start
+        pages = sum(count for _, count in results)
+        text_bytes = sum(len(text.encode()) for text, _ in results)
+        print(f"{workers:>8}{len(documents) / elapsed:>10.1f}{pages / elapsed:>10.1f}{elapsed:>10.2f}")
+
+    print(f"upload payload: {pdf_bytes / 1024:.0f} KB as PDF vs {text_bytes / 1024:.0f} KB as text "
+          f"({1 - text_bytes / pdf_bytes:.0%} smaller)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Self-contained load test for the API.
+
+Boots the FastAPI app under uvicorn against local stand-ins (fake model API and
+job feed, in-memory Mongo via mongomock-motor, SQLite through aiosqlite for
+users, an SMTP sink) and drives realistic user journeys: login, token
+validation, CV upload and parsing job polling, a multi-turn interview,
+feedback, contact form and job listing. Reports p50/p95/p99 latency and throughput per step.
+
+    pip install -r requirements.txt -r benchmarks/requirements.txt
+    python -m benchmarks.run                   # run and print the report
+    python -m benchmarks.run --save-baseline   # store the result as the baseline
+    python -m benchmarks.run --compare         # fail if p95 regressed vs. the baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import httpx
+
+from benchmarks.fakes import BackgroundServer, create_fake_model_app, free_port, start_smtp_sink, synthetic_cv_pdf
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+PASSWORD = "benchmark-password"
+
+def configure_environment(workdir: str, model_port: int, smtp_port: int):
+    os.environ.update({
+        "SECRET_KEY": "benchmark-secret",
+        "GMAIL_USER": "bench@example.com",
+        "GMAIL_PASSWORD": "",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USE_SSL": "false",
+        "CONTACT_POLL_INTERVAL": "1",
+        "CV_JOB_STORAGE_DIR": f"{workdir}/cv_jobs",
+        "MONGO_URI": "mongodb://127.0.0.1:27017",
+        "MONGO_DB_NAME": "benchmark",
+        "MONGO_CV_COLLECTION": "cvs",
+        "MONGO_INTERVIEW_COLLECTION": "interviews",
+        "MONGO_FEEDBACK_COLLECTION": "feedback",
+        "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/users.db",
+        "PG_USER": "benchmark",
+        "MODEL_API_URL": f"http://127.0.0.1:{model_port}",
+        "JOB_API_URL": f"http://127.0.0.1:{model_port}/jobs",
+        "GOOGLE_CLIENT_ID": "benchmark",
+        "GOOGLE_CLIENT_SECRET": "benchmark",
+        # Buckets in the in-memory Mongo stand-in, limits high enough for back-to-back journeys
+        "RATE_LIMIT_BACKEND": "mongo",
+        "RATE_LIMIT_CV_PER_MINUTE": "600",
+        "RATE_LIMIT_CV_BURST": "50",
+        "RATE_LIMIT_INTERVIEW_PER_MINUTE": "6000",
+        "RATE_LIMIT_INTERVIEW_BURST": "100",
+    })
+
+def load_app():
+    # Swap Mongo for an in-memory substitute before any module binds `mongo_db`
+    from mongomock_motor import AsyncMongoMockClient
+    from app.config import settings
+    import app.core.database as database
+    database.mongo_client = AsyncMongoMockClient()
+    database.mongo_db = database.mongo_client[settings.MONGO_DB_NAME]
+    from app.main import app
+    return app
+
+async def create_users(count: int):
+    from app.core.database import AsyncSessionLocal, engine
+    from app.models.postgres.user_model import Base, User
+    from app.services.auth.service import get_password_hash
+
+    hashed_password = get_password_hash(PASSWORD)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        session.add_all(User(email=f"user{i}@example.com", name=f"User {i}", hashed_password=hashed_password, is_active=True)
+                        for i in range(count))
+        await session.commit()
+    # The pooled connections belong to this loop; the server thread opens its own
+    await engine.dispose()
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def timed(self, step: str, request) -> httpx.Response | None:
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await request
+        except httpx.HTTPError:
+            pass
+        self.latencies.setdefault(step, []).append(time.perf_counter() - start)
+        if response is None or response.status_code >= 400:
+            self.errors[step] = self.errors.get(step, 0) + 1
+            return None
+        return response
+
+async def wait_for_cv_job(client: httpx.AsyncClient, recorder: Recorder, headers: dict, response: httpx.Response) -> str | None:
+    # Uploads are parsed in the background: poll the job until it finishes
+    start = time.perf_counter()
+    job = response.json()
+    while job["status"] in ("queued", "processing"):
+        await asyncio.sleep(0.05)
+        polled = await recorder.timed("cv_job_poll", client.get(response.headers["location"], headers=headers))
+        if polled is None:
+            return None
+        job = polled.json()
+    recorder.latencies.setdefault("cv_parsed", []).append(time.perf_counter() - start)
+    if job["status"] != "done":
+        recorder.errors["cv_parsed"] = recorder.errors.get("cv_parsed", 0) + 1
+        return None
+    return job["cv_id"]
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, index: int, iterations: int, turns: int):
+    email = f"user{index}@example.com"
+    for iteration in range(iterations):
+        response = await recorder.timed("login", client.post("/api/v1/auth/token", data={"username": email, "password": PASSWORD}))
+        if response is None:
+            continue
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await recorder.timed("validate_token", client.post("/api/v1/auth/validate", json={"token": token}))
+
+        cv_bytes = synthetic_cv_pdf(int.from_bytes(os.urandom(4), "big"))
+        response = await recorder.timed("cv_upload", client.post("/api/v1/interviews/cv", headers=headers,
+                                                                files={"cv": ("cv.pdf", cv_bytes, "application/pdf")}))
+        if response is None:
+            continue
+        cv_id = await wait_for_cv_job(client, recorder, headers, response)
+        if cv_id is None:
+            continue
+
+        response = await recorder.timed("interview_start", client.post("/api/v1/interviews/simulation/start", headers=headers,
+                                                                      json={"cv_id": cv_id, "initial_prompt": "Hello, I am ready for my interview."}))
+        if response is None:
+            continue
+        interview_id = response.json()["interview_id"]
+        for turn in range(turns - 1):
+            await recorder.timed("interview_turn", client.post(f"/api/v1/interviews/simulation/{interview_id}/continue", headers=headers,
+                                                               json={"role": "user", "content": f"Answer {turn}: I built APIs with FastAPI and MongoDB."}))
+
+        await recorder.timed("feedback", client.post("/api/v1/interviews/feedback", headers=headers,
+                                                     json={"interview_id": interview_id, "feedback_content": {"score": 4}}))
+        await recorder.timed("contact", client.post("/api/v1/contact/", json={"name": "Bench", "email": email,
+                                                                              "subject": "Hello", "message": f"Iteration {iteration}"}))
+        await recorder.timed("job_offers", client.get("/api/v1/jobs/", params={"limit": 20, "q": "python"}))
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    steps = {}
+    for step, values in recorder.latencies.items():
+        steps[step] = {
+            "count": len(values),
+            "errors": recorder.errors.get(step, 0),
+            "p50_ms": round(statistics.median(values) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "rps": round(len(values) / elapsed, 2),
+        }
+    total = sum(len(values) for values in recorder.latencies.values())
+    return {"elapsed_s": round(elapsed, 2), "total_requests": total, "rps": round(total / elapsed, 2), "steps": steps}
+
+def print_report(report: dict, baseline: dict | None = None):
+    print(f"{'step':<16}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}{'p95 vs base':>13}")
+    for step, stats in report["steps"].items():
+        delta = ""
+        base = (baseline or {}).get("steps", {}).get(step)
+        if base and base["p95_ms"]:
+            delta = f"{(stats['p95_ms'] - base['p95_ms']) / base['p95_ms']:+.0%}"
+        print(f"{step:<16}{stats['count']:>7}{stats['errors']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['rps']:>9}{delta:>13}")
+    print(f"total: {report['total_requests']} requests in {report['elapsed_s']}s ({report['rps']} req/s)")
+
+def regressions(report: dict, baseline: dict, threshold: float) -> list[str]:
+    failures = []
+    for step, base in baseline.get("steps", {}).items():
+        current = report["steps"].get(step)
+        if current is None:
+            failures.append(f"{step}: missing from this run")
+        elif base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            failures.append(f"{step}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+    return failures
+
+async def drive(base_url: str, users: int, iterations: int, turns: int) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(client, recorder, i, iterations, turns) for i in range(users)))
+        elapsed = time.perf_counter() - start
+    return summarize(recorder, elapsed)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=2, help="journeys per virtual user")
+    parser.add_argument("--turns", type=int, default=20, help="interview turns per journey")
+    parser.add_argument("--model-latency", type=float, default=50, help="fake model latency in ms")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="exit non-zero when p95 regresses beyond --threshold")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--output", type=Path, help="also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ai-interview-bench-")
+    model_port, smtp_port, api_port = free_port(), free_port(), free_port()
+    configure_environment(workdir, model_port, smtp_port)
+    app = load_app()
+    asyncio.run(create_users(args.users))
+
+    smtp_controller, smtp_sink = start_smtp_sink(smtp_port)
+    try:
+        with BackgroundServer(create_fake_model_app(latency_ms=args.model_latency), model_port), BackgroundServer(app, api_port):
+            report = asyncio.run(drive(f"http://127.0.0.1:{api_port}", args.users, args.iterations, args.turns))
+            time.sleep(1.5)  # let the contact worker drain its queue
+    finally:
+        smtp_controller.stop()
+
+    report["config"] = {"users": args.users, "iterations": args.iterations, "turns": args.turns, "model_latency_ms": args.model_latency}
+    report["emails_delivered"] = smtp_sink.received
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else None
+    print_report(report, baseline)
+    print(f"emails delivered to the SMTP sink: {smtp_sink.received}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline saved to {BASELINE_PATH}")
+    if args.compare:
+        if baseline is None:
+            print("no baseline to compare against", file=sys.stderr)
+            return 1
+        failures = regressions(report, baseline, args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())